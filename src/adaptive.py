@@ -0,0 +1,132 @@
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.batch import LINE, CircleBatch, frame_boundaries
+from src.bipolar import label_cells
+from src.circles import Num, Point2D, Range
+from src.raster import PARITY, Colour, distance_coverage, stroke_reach, to_rgb
+
+Grids = Sequence[Tuple[Num, Num]]
+
+
+class AdaptiveFrame(NamedTuple):
+    """Per-pixel coverage of an adaptively rendered frame, each (height, width) float32.
+
+    `parity` is the fraction of the pixel covered by cells of colour key 1 and
+    `stroke` the fraction covered by boundary strokes. `samples` counts the
+    points the cells were evaluated on.
+    """
+    parity: np.ndarray
+    stroke: np.ndarray
+    samples: int
+
+
+def tiles_crossed(boundaries: CircleBatch, x0: np.ndarray, x1: np.ndarray, y0: np.ndarray,
+                  y1: np.ndarray) -> np.ndarray:
+    """Whether any of `boundaries` passes through each box [x0, x1] x [y0, y1].
+
+    A circle (or point) crosses a box when its radius lies between the
+    distances from its centre to the nearest and to the farthest point of the
+    box; a line when the box corners are not all on one side of it.
+    """
+    b = boundaries.reshape(-1, 1)
+    near_x = np.maximum(np.maximum(x0 - b.centre_x, b.centre_x - x1), 0)
+    near_y = np.maximum(np.maximum(y0 - b.centre_y, b.centre_y - y1), 0)
+    far_x = np.maximum(np.abs(x0 - b.centre_x), np.abs(x1 - b.centre_x))
+    far_y = np.maximum(np.abs(y0 - b.centre_y), np.abs(y1 - b.centre_y))
+    circle_crossed = (np.hypot(near_x, near_y) <= b.radius) & (b.radius <= np.hypot(far_x, far_y))
+
+    low = np.minimum(b.normal_x * x0, b.normal_x * x1) + np.minimum(b.normal_y * y0, b.normal_y * y1)
+    high = np.maximum(b.normal_x * x0, b.normal_x * x1) + np.maximum(b.normal_y * y0, b.normal_y * y1)
+    line_crossed = (low <= b.offset) & (b.offset <= high)
+    return np.where(b.kind == LINE, line_crossed, circle_crossed).any(axis=0)
+
+
+def adaptive_frame(angle_grids: Grids,
+                   ratio_grids: Grids,
+                   focus_list: List[Point2D],
+                   x_range: Range,
+                   y_range: Range,
+                   plot_points: int = 200,
+                   stroke_width: Optional[float] = 1.0,
+                   supersample: int = 4,
+                   tile_size: int = 32) -> AdaptiveFrame:
+    """Renders a frame by quadtree subdivision of `tile_size` pixel tiles.
+
+    A tile no boundary crosses lies inside a single cell, so it is labelled by
+    its centre alone and filled in one go; a crossed tile is split in four down
+    to single pixels, which are then supersampled `supersample` x `supersample`
+    times. Strokes `stroke_width` pixels wide (none if None) are drawn from
+    their exact distance on those pixels only, the tiles being grown by the
+    stroke reach when testing for crossings.
+    """
+    if tile_size & (tile_size - 1):
+        raise ValueError(f"tile_size must be a power of 2. Given value: {tile_size}")
+    height = width = plot_points
+    x_step = (x_range.sup - x_range.inf) / width
+    y_step = (y_range.sup - y_range.inf) / height
+    margin = 0.0 if stroke_width is None else stroke_reach(stroke_width) * max(x_step, y_step)
+    boundaries = frame_boundaries(angle_grids, ratio_grids, focus_list)
+
+    parity = np.zeros((height, width), dtype=np.float32)
+    stroke = np.zeros((height, width), dtype=np.float32)
+    samples = 0
+    rows, cols = np.meshgrid(np.arange(0, height, tile_size), np.arange(0, width, tile_size),
+                             indexing="ij")
+    rows, cols = rows.ravel(), cols.ravel()
+    size = tile_size
+    while len(rows):
+        row_ends = np.minimum(rows + size, height)
+        col_ends = np.minimum(cols + size, width)
+        x0 = x_range.inf + cols * x_step
+        x1 = x_range.inf + col_ends * x_step
+        y0 = y_range.sup - row_ends * y_step
+        y1 = y_range.sup - rows * y_step
+        crossed = tiles_crossed(boundaries, x0 - margin, x1 + margin, y0 - margin, y1 + margin)
+
+        uniform = np.flatnonzero(~crossed)
+        angle_index, ratio_index = label_cells((x0[uniform] + x1[uniform]) / 2,
+                                               (y0[uniform] + y1[uniform]) / 2, angle_grids,
+                                               ratio_grids, focus_list)
+        samples += len(uniform)
+        for tile, value in zip(uniform, (angle_index + ratio_index) & PARITY):
+            parity[rows[tile]:row_ends[tile], cols[tile]:col_ends[tile]] = value
+
+        rows, cols = rows[crossed], cols[crossed]
+        if size == 1:
+            samples += _supersample(parity, stroke, rows, cols, boundaries, angle_grids,
+                                    ratio_grids, focus_list, x_range, y_range, x_step, y_step,
+                                    stroke_width, supersample)
+            break
+        size //= 2
+        rows = np.concatenate([rows, rows, rows + size, rows + size])
+        cols = np.concatenate([cols, cols + size, cols, cols + size])
+        inside = (rows < height) & (cols < width)
+        rows, cols = rows[inside], cols[inside]
+    return AdaptiveFrame(parity, stroke, samples)
+
+
+def _supersample(parity: np.ndarray, stroke: np.ndarray, rows: np.ndarray, cols: np.ndarray,
+                 boundaries: CircleBatch, angle_grids: Grids, ratio_grids: Grids,
+                 focus_list: List[Point2D], x_range: Range, y_range: Range, x_step: float,
+                 y_step: float, stroke_width: Optional[float], supersample: int) -> int:
+    centre_x = x_range.inf + (cols + 0.5) * x_step
+    centre_y = y_range.sup - (rows + 0.5) * y_step
+    offsets = (np.arange(supersample) + 0.5) / supersample - 0.5
+    sub_x = (centre_x[:, np.newaxis, np.newaxis] + offsets[np.newaxis, :] * x_step)
+    sub_y = (centre_y[:, np.newaxis, np.newaxis] - offsets[:, np.newaxis] * y_step)
+    angle_index, ratio_index = label_cells(sub_x, sub_y, angle_grids, ratio_grids, focus_list)
+    parity[rows, cols] = ((angle_index + ratio_index) & PARITY).mean(axis=(1, 2))
+    if stroke_width is not None:
+        distance = boundaries.distance(centre_x, centre_y).min(axis=0)
+        stroke[rows, cols] = distance_coverage(distance, max(x_step, y_step), stroke_width)
+    return len(rows) * supersample**2
+
+
+def compose(frame: AdaptiveFrame, col_dict: Dict, bound_col: Colour = "black") -> np.ndarray:
+    """(height, width, 3) uint8 RGB image of an `AdaptiveFrame`."""
+    cell0, cell1 = (np.array(to_rgb(col_dict[key]), dtype=np.float32) for key in (0, 1))
+    image = cell0 + frame.parity[..., np.newaxis] * (cell1 - cell0)
+    image += frame.stroke[..., np.newaxis] * (np.array(to_rgb(bound_col), dtype=np.float32) - image)
+    return np.round(image).astype(np.uint8)
@@ -0,0 +1,238 @@
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy import inf, pi
+
+from src.circles import AppolonianCircle, CanonicalCircle, Circle, Line, Num, Point2D
+from src.utils import cot, mod_
+
+# Values of CircleBatch.kind
+LINE = 0
+CIRCLE = 1
+POINT = 2
+
+
+@dataclass
+class CircleBatch:
+    """Struct-of-arrays form of many boundaries, all arrays sharing one shape.
+
+    Circles and points are stored by centre and radius, lines by unit normal
+    and offset (v . z = d); entries of the other kind hold nan. An
+    `AppolonianCircle` is stored as the circle it describes, flipped inside out
+    when its ratio exceeds 1, so `evaluate` agrees with `Circle.evaluate` in
+    sign, which is all the regions depend on.
+    """
+    kind: np.ndarray
+    centre_x: np.ndarray
+    centre_y: np.ndarray
+    radius: np.ndarray
+    normal_x: np.ndarray
+    normal_y: np.ndarray
+    offset: np.ndarray
+    insideout: np.ndarray
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.kind.shape
+
+    def __len__(self) -> int:
+        return len(self.kind)
+
+    def __getitem__(self, index) -> "CircleBatch":
+        return CircleBatch(*(np.asarray(getattr(self, name)[index]) for name in _FIELDS))
+
+    def reshape(self, *shape: int) -> "CircleBatch":
+        return CircleBatch(*(getattr(self, name).reshape(*shape) for name in _FIELDS))
+
+    @classmethod
+    def empty(cls, shape: Tuple[int, ...]) -> "CircleBatch":
+        return cls(
+            kind=np.full(shape, CIRCLE, dtype=np.uint8),
+            centre_x=np.full(shape, np.nan),
+            centre_y=np.full(shape, np.nan),
+            radius=np.full(shape, np.nan),
+            normal_x=np.full(shape, np.nan),
+            normal_y=np.full(shape, np.nan),
+            offset=np.full(shape, np.nan),
+            insideout=np.zeros(shape, dtype=bool),
+        )
+
+    @classmethod
+    def concatenate(cls, batches: Sequence["CircleBatch"]) -> "CircleBatch":
+        return cls(*(np.concatenate([getattr(batch, name).reshape(-1) for batch in batches])
+                     for name in _FIELDS))
+
+    @classmethod
+    def from_circles(cls, circles: Sequence[Circle]) -> "CircleBatch":
+        batch = cls.empty((len(circles), ))
+        for i, circle in enumerate(circles):
+            if isinstance(circle, Line):
+                batch.kind[i] = LINE
+                batch.normal_x[i], batch.normal_y[i] = circle.v.x, circle.v.y
+                batch.offset[i] = circle.d
+                batch.insideout[i] = circle._insideout
+            elif isinstance(circle, CanonicalCircle):
+                batch.kind[i] = POINT if circle.is_point else CIRCLE
+                batch.centre_x[i], batch.centre_y[i] = circle.c.x, circle.c.y
+                batch.radius[i] = circle.r
+                batch.insideout[i] = circle.is_isideout
+            elif isinstance(circle, AppolonianCircle):
+                one = appolonian_batch(np.array([circle.r]), circle.f1, circle.f2)
+                for name in _FIELDS:
+                    getattr(batch, name)[i] = getattr(one, name)[0]
+            else:
+                raise TypeError(f"unsupported boundary: {circle!r}")
+        return batch
+
+    def to_circles(self) -> List[Circle]:
+        """Flattened list of `Line`/`CanonicalCircle` objects, points as zero-radius circles."""
+        circles: List[Circle] = []
+        flat = self.reshape(-1)
+        for i in range(len(flat)):
+            if flat.kind[i] == LINE:
+                circle: Circle = Line(Point2D(float(flat.normal_x[i]), float(flat.normal_y[i])),
+                                      float(flat.offset[i]))
+                if flat.insideout[i]:
+                    circle.flip_insideout()
+            else:
+                circle = CanonicalCircle(Point2D(float(flat.centre_x[i]), float(flat.centre_y[i])),
+                                         float(flat.radius[i]), bool(flat.insideout[i]))
+            circles.append(circle)
+        return circles
+
+    def evaluate(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Signed equations of every boundary on every point: shape `self.shape + xs/ys shape`."""
+        expand = (Ellipsis, ) + (np.newaxis, ) * np.broadcast(xs, ys).ndim
+
+        def field(name: str) -> np.ndarray:
+            return getattr(self, name)[expand]
+
+        circle_values = (xs - field("centre_x"))**2 + (ys - field("centre_y"))**2 - field("radius")**2
+        line_values = field("normal_x") * xs + field("normal_y") * ys - field("offset")
+        values = np.where(field("kind") == LINE, line_values, circle_values)
+        return np.where(field("insideout"), -values, values)
+
+    def distance(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Unsigned Euclidean distance from every point to every boundary, shaped like `evaluate`."""
+        expand = (Ellipsis, ) + (np.newaxis, ) * np.broadcast(xs, ys).ndim
+
+        def field(name: str) -> np.ndarray:
+            return getattr(self, name)[expand]
+
+        circle_distance = np.abs(np.hypot(xs - field("centre_x"), ys - field("centre_y")) - field("radius"))
+        line_distance = np.abs(field("normal_x") * xs + field("normal_y") * ys - field("offset"))
+        return np.where(field("kind") == LINE, line_distance, circle_distance)
+
+
+_FIELDS = ("kind", "centre_x", "centre_y", "radius", "normal_x", "normal_y", "offset", "insideout")
+
+
+def angle_grids_batch(init_angles: np.ndarray, p: int = 6) -> np.ndarray:
+    """`get_angle_grids` for every initial angle at once: shape (n, p, 2)."""
+    steps = np.arange(p + 1) * pi / p
+    bounds = mod_(np.asarray(init_angles, dtype=float)[:, np.newaxis] + steps, pi)
+    return np.stack([bounds[:, :-1], bounds[:, 1:]], axis=-1)
+
+
+def vertical_bound_batch(angles: np.ndarray,
+                         focus_list: Optional[List[Point2D]] = None) -> CircleBatch:
+    """`get_vertical_bound(cot(angle))` for an array of tangent angles.
+
+    Without `focus_list` the foci are (0, 1) and (0, -1) as in
+    `get_vertical_bound`. Otherwise the same construction is carried over to
+    the given foci: the circle through both with tangent angle a is centred
+    cot(a) half focal distances from their midpoint along the normal
+    (dy, -dx) of the focal direction d = (f1 - f2) / |f1 - f2|.
+    """
+    if focus_list is None:
+        focus_list = [Point2D(0, 1), Point2D(0, -1)]
+    focus1, focus2 = focus_list
+    half_distance = np.hypot(focus1.x - focus2.x, focus1.y - focus2.y) / 2
+    mid_x, mid_y = (focus1.x + focus2.x) / 2, (focus1.y + focus2.y) / 2
+    normal_x = (focus1.y - focus2.y) / (2 * half_distance)
+    normal_y = -(focus1.x - focus2.x) / (2 * half_distance)
+
+    angles = np.asarray(angles, dtype=float)
+    batch = CircleBatch.empty(angles.shape)
+    centre_x = cot(angles)
+    is_line = np.isinf(centre_x)
+    batch.kind[is_line] = LINE
+    batch.normal_x[is_line] = -np.sign(centre_x[is_line]) * normal_x
+    batch.normal_y[is_line] = -np.sign(centre_x[is_line]) * normal_y
+    batch.offset[is_line] = batch.normal_x[is_line] * mid_x + batch.normal_y[is_line] * mid_y
+    is_circle = ~is_line
+    batch.centre_x[is_circle] = mid_x + centre_x[is_circle] * half_distance * normal_x
+    batch.centre_y[is_circle] = mid_y + centre_x[is_circle] * half_distance * normal_y
+    batch.radius[is_circle] = half_distance * np.sqrt(centre_x[is_circle]**2 + 1)
+    return batch
+
+
+def vertical_bounded_regions_batch(angle_grids: np.ndarray) -> Tuple[CircleBatch, CircleBatch]:
+    """Lower and upper bounds of `get_vertical_bounded_regions` for (..., p, 2) angle grids,
+    with the same orientation flips applied."""
+    lower = vertical_bound_batch(angle_grids[..., 0])
+    upper = vertical_bound_batch(angle_grids[..., 1])
+    both_circles = (lower.kind == CIRCLE) & (upper.kind == CIRCLE)
+    upper.insideout ^= both_circles & (upper.centre_x > lower.centre_x)
+    line_then_circle = (lower.kind == LINE) & (upper.kind == CIRCLE)
+    lower.insideout ^= line_then_circle & (lower.normal_x > 0)
+    return lower, upper
+
+
+def appolonian_batch(ratios: np.ndarray, focus1: Point2D, focus2: Point2D) -> CircleBatch:
+    """`AppolonianCircle(focus1, focus2, ratio)` for an array of ratios.
+
+    |z - f1|^2 - k |z - f2|^2 = (1 - k) (|z - c|^2 - R^2) with
+    c = (f1 - k f2) / (1 - k) and R^2 = k |f1 - f2|^2 / (1 - k)^2; k = 1 is the
+    perpendicular bisector and k = 0, inf are the foci.
+    """
+    ratios = np.asarray(ratios, dtype=float)
+    batch = CircleBatch.empty(ratios.shape)
+    f1 = np.array([focus1.x, focus1.y], dtype=float)
+    f2 = np.array([focus2.x, focus2.y], dtype=float)
+    distance = np.hypot(*(f1 - f2))
+
+    at_f1 = ratios == 0
+    at_f2 = ratios == inf
+    bisector = ratios == 1
+    circle = ~(at_f1 | at_f2 | bisector)
+
+    batch.kind[at_f1 | at_f2] = POINT
+    batch.centre_x[at_f1], batch.centre_y[at_f1] = f1
+    batch.centre_x[at_f2], batch.centre_y[at_f2] = f2
+    batch.radius[at_f1 | at_f2] = 0
+
+    batch.kind[bisector] = LINE
+    normal = (f2 - f1) / distance
+    batch.normal_x[bisector], batch.normal_y[bisector] = normal
+    batch.offset[bisector] = (f2 @ f2 - f1 @ f1) / (2 * distance)
+
+    k = ratios[circle]
+    batch.centre_x[circle] = (f1[0] - k * f2[0]) / (1 - k)
+    batch.centre_y[circle] = (f1[1] - k * f2[1]) / (1 - k)
+    batch.radius[circle] = np.sqrt(k) * distance / np.abs(1 - k)
+    batch.insideout[circle] = k > 1
+    return batch
+
+
+def horizontal_bounded_regions_batch(ratio_grids: Sequence[Tuple[Num, Num]],
+                                     focus_list: List[Point2D]) -> Tuple[CircleBatch, CircleBatch]:
+    """Lower and upper bounds of `get_horizontal_bounded_regions`."""
+    focus1, focus2 = focus_list
+    ratios = np.array(ratio_grids, dtype=float)
+    return (appolonian_batch(ratios[:, 0], focus1, focus2),
+            appolonian_batch(ratios[:, 1], focus1, focus2))
+
+
+def frame_boundaries(angle_grids: Sequence[Tuple[Num, Num]],
+                     ratio_grids: Sequence[Tuple[Num, Num]],
+                     focus_list: List[Point2D]) -> CircleBatch:
+    """Every distinct boundary of one checkerboard frame, the two foci included as points."""
+    focus1, focus2 = focus_list
+    angles = np.array([lower for lower, _ in angle_grids], dtype=float)
+    ratios = np.array([lower for lower, _ in ratio_grids] + [ratio_grids[-1][1]], dtype=float)
+    return CircleBatch.concatenate([
+        vertical_bound_batch(angles, focus_list),
+        appolonian_batch(ratios, focus1, focus2),
+    ])
@@ -0,0 +1,220 @@
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+from numpy import pi
+
+from src.checkerboard import (COL_DICT, AnimationConfig, get_angle_grids, get_ratio_grids, label_checkerboard,
+                              make_checkerboard, render_animation)
+from src.circles import Point2D, Range
+from src.encoding import GifWriter
+from src.matplotlib_backend import MatplotlibRenderer
+from src.raster import colorize
+
+FOCUS_LIST = [Point2D(0, 1), Point2D(0, -1)]
+WINDOW = Range(-6, 6)
+
+# Parameter values every benchmark is run for; `QUICK_MATRIX` is a smoke test.
+MATRIX: Dict[str, Sequence[int]] = {
+    "p": (6, 12, 48),
+    "ratio_steps": (4, 16),
+    "plot_points": (200, 1000, 4000),
+    "animation_plot_points": (200, 1000),
+    "frame_num": (10, 40),
+}
+QUICK_MATRIX: Dict[str, Sequence[int]] = {
+    "p": (6, ),
+    "ratio_steps": (4, ),
+    "plot_points": (200, ),
+    "animation_plot_points": (100, ),
+    "frame_num": (4, ),
+}
+
+
+class Case(NamedTuple):
+    """A benchmark: `run` is timed `repeat` times; `frames` turns the time into frames/sec."""
+    name: str
+    params: Dict[str, Any]
+    run: Callable[[], Any]
+    repeat: int = 5
+    frames: int = 0
+
+
+def peak_rss_mb() -> Optional[float]:
+    """High-water mark of the resident set of this process and its finished children."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # Kilobytes on Linux, bytes on macOS.
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def measure(case: Case) -> Dict[str, Any]:
+    times = []
+    for _ in range(case.repeat):
+        start = time.perf_counter()
+        case.run()
+        times.append(time.perf_counter() - start)
+    result = {
+        "name": case.name,
+        "params": case.params,
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    if case.frames:
+        result["frames_per_s"] = case.frames / statistics.median(times)
+    return result
+
+
+def make_cases(matrix: Dict[str, Sequence[int]], seed: int = 0) -> Iterator[Case]:
+    """Every benchmark for every combination in `matrix`, smallest first so the
+    RSS high-water mark stays attributable to the case that raised it."""
+    rng = np.random.default_rng(seed)
+    init_angle = float(rng.uniform(0, pi / 3))
+
+    for p in matrix["p"]:
+        for steps in matrix["ratio_steps"]:
+            yield Case("construction", {"p": p, "ratio_steps": steps},
+                       lambda p=p, steps=steps: make_checkerboard(
+                           get_angle_grids(init_angle, p), get_ratio_grids(steps), FOCUS_LIST))
+
+    for plot_points in sorted(matrix["plot_points"]):
+        for p in matrix["p"]:
+            for steps in matrix["ratio_steps"]:
+                params = {"p": p, "ratio_steps": steps, "plot_points": plot_points}
+                angle_grids, ratio_grids = get_angle_grids(init_angle, p), get_ratio_grids(steps)
+                yield Case("label_frame", params,
+                           lambda angle_grids=angle_grids, ratio_grids=ratio_grids, plot_points=plot_points:
+                           label_checkerboard(angle_grids, ratio_grids, FOCUS_LIST, WINDOW, WINDOW, FOCUS_LIST,
+                                              plot_points),
+                           frames=1)
+        labels = label_checkerboard(get_angle_grids(init_angle), get_ratio_grids(), FOCUS_LIST, WINDOW, WINDOW,
+                                    FOCUS_LIST, plot_points)
+        yield Case("colorize", {"plot_points": plot_points},
+                   lambda labels=labels: colorize(labels, COL_DICT),
+                   frames=1)
+        yield Case("matplotlib_frame", {"plot_points": plot_points, "reuse": False},
+                   lambda plot_points=plot_points: _matplotlib_renderer(plot_points).render(
+                       get_angle_grids(init_angle)),
+                   repeat=3,
+                   frames=1)
+        renderer = _matplotlib_renderer(plot_points)
+        yield Case("matplotlib_frame", {"plot_points": plot_points, "reuse": True},
+                   lambda renderer=renderer: renderer.render(get_angle_grids(init_angle)),
+                   frames=1)
+        frame = colorize(labels, COL_DICT)
+        for frame_num in matrix["frame_num"]:
+            yield Case("encode_gif", {"plot_points": plot_points, "frame_num": frame_num},
+                       lambda frame=frame, frame_num=frame_num: _encode(frame, frame_num),
+                       repeat=3,
+                       frames=frame_num)
+
+    for plot_points in sorted(matrix["animation_plot_points"]):
+        for frame_num in matrix["frame_num"]:
+            yield Case("end_to_end", {"plot_points": plot_points, "frame_num": frame_num},
+                       lambda plot_points=plot_points, frame_num=frame_num: _animate(plot_points, frame_num),
+                       repeat=3,
+                       frames=frame_num)
+
+
+def _matplotlib_renderer(plot_points: int) -> MatplotlibRenderer:
+    return MatplotlibRenderer(get_ratio_grids(), FOCUS_LIST, WINDOW, WINDOW, COL_DICT, plot_points=plot_points)
+
+
+def _encode(frame: np.ndarray, frame_num: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        with GifWriter(Path(tmp) / "bench.gif", fps=10) as writer:
+            for _ in range(frame_num):
+                writer.append(frame)
+
+
+def _animate(plot_points: int, frame_num: int) -> None:
+    init_val_list = [i / frame_num * pi / 3 for i in range(frame_num)]
+    with tempfile.TemporaryDirectory() as tmp:
+        with GifWriter(Path(tmp) / "bench.gif", fps=10) as writer:
+            render_animation(AnimationConfig(plot_points=plot_points), init_val_list, writer)
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).parent).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+    }
+
+
+def find_regressions(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]],
+                     threshold: float = 0.1) -> List[str]:
+    """Results whose median time exceeds the baseline's for the same case by more than `threshold`."""
+    def case_id(result: Dict[str, Any]) -> str:
+        return json.dumps([result["name"], result["params"]], sort_keys=True)
+
+    baseline_times = {case_id(result): result["median_s"] for result in baseline}
+    regressions = []
+    for result in results:
+        before = baseline_times.get(case_id(result))
+        if before is not None and result["median_s"] > before * (1 + threshold):
+            regressions.append(f"{result['name']} {result['params']}: "
+                               f"{before:.4g}s -> {result['median_s']:.4g}s "
+                               f"(+{result['median_s'] / before - 1:.0%})")
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Times geometry, rendering, encoding and whole animations.")
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--quick", action="store_true", help="run a small parameter matrix only")
+    parser.add_argument("--only", nargs="+", default=None, metavar="NAME",
+                        help="run only these benchmarks, e.g. label_frame end_to_end")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=None,
+                        help="earlier output to compare against; exits with 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative slowdown of the median time counted as a regression")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    matrix = QUICK_MATRIX if args.quick else MATRIX
+    results = []
+    for case in make_cases(matrix, seed=args.seed):
+        if args.only is not None and case.name not in args.only:
+            continue
+        result = measure(case)
+        print(f"{result['name']:<14} {json.dumps(result['params']):<55} {result['median_s']:.4g}s")
+        results.append(result)
+    with open(args.output, "w") as f:
+        json.dump({"environment": environment(), "seed": args.seed, "results": results}, f, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = find_regressions(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
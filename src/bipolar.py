@@ -0,0 +1,64 @@
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from numpy import pi
+
+from src.circles import Num, Point2D
+
+
+def bipolar_coordinates(xs: np.ndarray, ys: np.ndarray, focus_list: List[Point2D],
+                        dtype=np.float64) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the (angle, ratio) bipolar coordinates of every point.
+
+    The angle is arg((z - f2) / (z - f1)) taken modulo pi, which is the tangent
+    angle `a` of the circle through both foci with centre (cot(a), 0) used by
+    `get_vertical_bound`. The ratio is |z - f1|^2 / |z - f2|^2, the parameter of
+    the `AppolonianCircle` passing through the point.
+
+    Both are computed in `dtype` in three arrays of the broadcast shape of
+    `xs` and `ys`, two of which are returned.
+    """
+    focus1, focus2 = focus_list
+    x1, y1 = np.subtract(xs, focus1.x, dtype=dtype), np.subtract(ys, focus1.y, dtype=dtype)
+    x2, y2 = np.subtract(xs, focus2.x, dtype=dtype), np.subtract(ys, focus2.y, dtype=dtype)
+    shape = np.broadcast_shapes(np.shape(xs), np.shape(ys))
+    angles, ratios, scratch = (np.empty(shape, dtype=dtype) for _ in range(3))
+    # (z - f2) * conj(z - f1) has the same argument as (z - f2) / (z - f1).
+    np.multiply(y2, x1, out=angles)
+    angles -= np.multiply(x2, y1, out=scratch)
+    np.multiply(x2, x1, out=ratios)
+    ratios += np.multiply(y2, y1, out=scratch)
+    np.arctan2(angles, ratios, out=angles)
+    angles %= pi
+    np.add(x1 * x1, y1 * y1, out=ratios)
+    np.add(x2 * x2, y2 * y2, out=scratch)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratios /= scratch
+    return angles, ratios
+
+
+def band_index(values: np.ndarray, grids: Sequence[Tuple[Num, Num]]) -> np.ndarray:
+    """Index of the grid band `(lower, upper)` containing each value.
+
+    Bands are looked up by their lower bounds only, so a band whose lower bound
+    exceeds its upper bound (an angle band wrapping around pi) catches the
+    values below the smallest lower bound.
+    """
+    values = np.asarray(values)
+    lowers = np.array([lower for lower, _ in grids], dtype=float)
+    order = np.argsort(lowers, kind="stable").astype(np.min_scalar_type(len(lowers)))
+    lowers = lowers[order]
+    if values.dtype.kind == "f":
+        # Searching float64 bounds would convert all the values to float64 first.
+        lowers = lowers.astype(values.dtype)
+    positions = np.searchsorted(lowers, values, side="right")
+    positions -= 1
+    return order[positions]
+
+
+def label_cells(xs: np.ndarray, ys: np.ndarray, angle_grids: Sequence[Tuple[Num, Num]],
+                ratio_grids: Sequence[Tuple[Num, Num]], focus_list: List[Point2D],
+                dtype=np.float64) -> Tuple[np.ndarray, np.ndarray]:
+    """(angle band, ratio band) index of the checkerboard cell under every point."""
+    angles, ratios = bipolar_coordinates(xs, ys, focus_list, dtype)
+    return band_index(angles, angle_grids), band_index(ratios, ratio_grids)
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from dataclasses import asdict, is_dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+import numpy as np
+
+# Bump whenever the rendering of a given set of parameters changes, so stale
+# frames on disk are never served.
+CACHE_VERSION = 3
+
+
+def _canonical(value: Any) -> Any:
+    if is_dataclass(value) and not isinstance(value, type):
+        return _canonical(asdict(value))
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, (float, np.floating)):
+        # repr() round-trips exactly and also covers inf/nan, which JSON lacks.
+        return repr(float(value))
+    if isinstance(value, np.integer):
+        return int(value)
+    return value
+
+
+def frame_key(**params: Any) -> str:
+    """Stable content hash of the parameters a frame is rendered from."""
+    payload = json.dumps(_canonical(dict(params, cache_version=CACHE_VERSION)),
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class FrameCache:
+    """Two-tier frame cache: a byte-bounded in-process LRU in front of an optional
+    size-capped directory of `.npz` files shared between processes and runs.
+
+    Disk entries are evicted oldest-access first once the directory grows past
+    `max_disk_bytes`.
+    """
+    def __init__(self,
+                 max_memory_bytes: int = 256 * 2**20,
+                 directory: Optional[Union[str, Path]] = None,
+                 max_disk_bytes: int = 2**30):
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.directory = Path(directory) if directory is not None else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._memory_bytes = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.npz"
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                frame = data["frame"]
+            os.utime(path)
+        except (FileNotFoundError, OSError, ValueError, KeyError):
+            # Missing, evicted by another process meanwhile, or truncated.
+            return None
+        self._remember(key, frame)
+        return frame
+
+    def put(self, key: str, frame: np.ndarray) -> None:
+        frame = np.array(frame)
+        self._remember(key, frame)
+        if self.directory is not None:
+            self._store(key, frame)
+
+    def get_or_render(self, key: str, render: Callable[[], np.ndarray]) -> np.ndarray:
+        frame = self.get(key)
+        if frame is None:
+            frame = render()
+            self.put(key, frame)
+        return frame
+
+    def _remember(self, key: str, frame: np.ndarray) -> None:
+        if key in self._memory:
+            self._memory_bytes -= self._memory.pop(key).nbytes
+        if frame.nbytes > self.max_memory_bytes:
+            return
+        self._memory[key] = frame
+        self._memory_bytes += frame.nbytes
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.nbytes
+
+    def _store(self, key: str, frame: np.ndarray) -> None:
+        # Write under a temporary name and rename, so concurrent readers never
+        # see a partial file.
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(f, frame=frame)
+            os.replace(tmp_name, self._path(key))
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        entries = []
+        for path in self.directory.glob("*.npz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
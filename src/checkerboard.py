@@ -1,18 +1,39 @@
 import argparse
-from dataclasses import dataclass
-from itertools import product
-from multiprocessing import Pool
-from typing import Dict, List, NamedTuple, Tuple, Union
-
+import os
+import tempfile
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import count, product
+from multiprocessing import Pool, cpu_count
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
 from numpy import exp, inf, pi, sqrt
 
-from src.circles import AppolonianCircle, CanonicalCircle, Circle, Line, Num, Point2D
+from src.adaptive import adaptive_frame, compose
+from src.batch import frame_boundaries
+from src.bipolar import label_cells
+from src.cache import FrameCache, frame_key
+from src.circles import (AppolonianCircle, CanonicalCircle, Circle, Inequality,
+                         Line, Num, Point2D, Range)
+from src.encoding import FrameWriter, open_writer
+from src.instrument import TraceSpec, disable_tracing, enable_tracing, stage, trace_spec, traced
+from src.matplotlib_backend import MatplotlibRenderer
+from src.moebius import FAMILIES, MoebiusRenderer, family_transforms
+from src.pipeline import SharedFrameRing, attach_ring, bounded_imap, shared_imap
+from src.raster import (BOUNDARY, MARKER, PARITY, boundary_mask, colorize, edge_mask, label_palette,
+                        make_grid, mark_point, quantize_coverage, rasterize_regions, stroke_coverage, to_rgb)
+from src.store import FrameStore, fill_store
+from src.svg import write_animated_svg, write_svg
+from src.symmetry import FramePlan, limit_retention, mirrored_label_cells, plan_frames, replay_frames
+from src.tiling import Tile, render_tiled
 from src.utils import cot, mod_
+from src.warp import TextureWarper, warp
 
 
-class Range(NamedTuple):
-    inf: Num
-    sup: Num
+COL_DICT = {0: "yellow", 1: "lawngreen"}
 
 
 @dataclass
@@ -23,9 +44,9 @@ class BoundedRegion:
 
 
 def get_vertical_bound(centre_x: Num) -> Union[Line, CanonicalCircle]:
-    if centre_x is +inf:
+    if centre_x == +inf:
         return Line(Point2D(-1, 0), 0)
-    elif centre_x is -inf:
+    elif centre_x == -inf:
         return Line(Point2D(1, 0), 0)
     else:
         centre_x = float(centre_x)
@@ -81,9 +102,9 @@ def get_angle_grids(init_angle: Num = 0, p: int = 6) -> List[Tuple[Num, Num]]:
             for i in range(p)]
 
 
-def get_ratio_grids() -> List[Range]:
+def get_ratio_grids(steps: int = 4, spacing: float = 0.5) -> List[Range]:
     val_list: List[Num]
-    val_list = [exp(0.5 * i) for i in range(-4, 5)]
+    val_list = [exp(spacing * i) for i in range(-steps, steps + 1)]
     val_list = [0.0] + val_list + [inf]
     ratio_grids = []
     for i in range(len(val_list) - 1):
@@ -91,13 +112,11 @@ def get_ratio_grids() -> List[Range]:
     return ratio_grids
 
 
+@traced()
 def make_checkerboard(angle_grids,
                       ratio_grids,
                       focus_list,
-                      col_dict: Dict = {
-                          0: "yellow",
-                          1: "lawngreen"
-                      }):
+                      col_dict: Dict = COL_DICT):
     # print(angle_grids)
     v_boundaries, v_region_grids = get_vertical_bounded_regions(angle_grids)
     # print(verti_region_grids)
@@ -111,20 +130,20 @@ def make_checkerboard(angle_grids,
     region_list = []
     for h_region, v_region in product(h_region_grids, v_region_grids):
         if h_region.upper_bound.is_point:
-            region0 = [h_region.lower_bound.alg_eq > 0]
+            region0 = [Inequality(h_region.lower_bound, +1)]
         else:
             region0 = [
-                h_region.lower_bound.alg_eq > 0,
-                h_region.upper_bound.alg_eq < 0,
+                Inequality(h_region.lower_bound, +1),
+                Inequality(h_region.upper_bound, -1),
             ]
         # Plots two regions of symmetric difference of the two boundary circles: (not C_1 \cap C_2) \cup (C_1 and \cap C_2)
         region1 = [
-            v_region.lower_bound.alg_eq < 0,
-            v_region.upper_bound.alg_eq > 0,
+            Inequality(v_region.lower_bound, -1),
+            Inequality(v_region.upper_bound, +1),
         ]
         region2 = [
-            v_region.lower_bound.alg_eq > 0,
-            v_region.upper_bound.alg_eq < 0,
+            Inequality(v_region.lower_bound, +1),
+            Inequality(v_region.upper_bound, -1),
         ]
         col_key = get_col_key(h_region.col_key + v_region.col_key)
         incol = col_dict[col_key]
@@ -141,65 +160,594 @@ def render_objects(
     point_list: List[Point2D] = [],
     plot_points: int = 200,
     bound_col: str = "black",
-):
-    # x_min, x_max = x_range
-    # y_min, y_max = y_range
-    # G = Graphics()
-    # if len(point_list) > 0:
-    #     for point in point_list:
-    #         G += point2d(point)
-
-    # for region, incol in region_list:
-    #     G += region_plot(region, [x, x_min, x_max], [y, y_min, y_max], incol=incol, plot_points=plot_points)
+) -> np.ndarray:
+    """Rasterizes the checkerboard into a (plot_points, plot_points, 3) uint8 RGB frame."""
+    xs, ys = make_grid(x_range, y_range, plot_points)
+    image = rasterize_regions(region_list, xs, ys)
+
+    bound_rgb = to_rgb(bound_col)
+    for boundary in boundaries:
+        image[boundary_mask(boundary, xs, ys)] = bound_rgb
+
+    pixel_size = (x_range.sup - x_range.inf) / plot_points
+    marker = np.zeros(image.shape[:2], dtype=np.uint8)
+    for point in point_list:
+        mark_point(marker, point, xs, ys, 2 * pixel_size, MARKER)
+    image[marker != 0] = bound_rgb
+    return image
+
+
+def label_checkerboard(
+    angle_grids: List[Tuple[Num, Num]],
+    ratio_grids: List[Range],
+    focus_list: List[Point2D],
+    x_range: Range,
+    y_range: Range,
+    point_list: List[Point2D] = [],
+    plot_points: int = 200,
+    mirror: bool = True,
+    stroke_width: Optional[float] = None,
+    tile: Optional[Tile] = None,
+    out: Optional[np.ndarray] = None,
+    max_memory_mb: Optional[float] = None,
+    dtype=np.float64,
+) -> np.ndarray:
+    """Label map (see `src.raster.PARITY`) of the checkerboard, labelled in closed form.
+
+    Each pixel is assigned its cell from its bipolar coordinates, so the cost
+    does not depend on the number of angle or ratio bands. With `mirror`, only
+    the part of the frame not reachable by its mirror symmetries is evaluated.
+    The map is written into `out` when given, e.g. a slot of a `SharedFrameRing`.
+
+    By default the pixels where the cell changes are marked as fully covered
+    boundary. With `stroke_width` (in pixels) the boundaries are instead drawn
+    as anti-aliased strokes from their exact distance to every pixel.
+
+    With `tile`, only that tile of the frame is labelled, identically to the
+    same pixels of the whole frame.
+
+    With `max_memory_mb`, the frame (or tile) is labelled in blocks of rows
+    whose intermediate arrays fit in that budget, again with identical labels,
+    though a block evaluates only its column mirror. The coordinates are
+    evaluated in `dtype`; float32 halves their memory and moves only the
+    pixels within about 1e-6 of the frame size of a cell edge.
+    """
+    xs, ys = make_grid(x_range, y_range, plot_points)
+    pixel_size = (x_range.sup - x_range.inf) / plot_points
+    if tile is None:
+        tile = Tile(0, plot_points, 0, plot_points)
+    if out is None:
+        out = np.empty(tile.shape, dtype=np.uint8)
+    block_rows = tile.shape[0]
+    if max_memory_mb is not None:
+        per_row = tile.shape[1] * label_bytes_per_pixel(dtype, stroke_width)
+        block_rows = max(1, int(max_memory_mb * 2**20 // per_row))
+    for row0 in range(tile.row0, tile.row1, block_rows):
+        block = tile._replace(row0=row0, row1=min(row0 + block_rows, tile.row1))
+        target = out[block.row0 - tile.row0:block.row1 - tile.row0]
+        # Cell edges are marked on the pixel past the edge, so a block is
+        # labelled with the row and column before it, where there are some.
+        pad_row, pad_col = min(block.row0, 1), min(block.col0, 1)
+        block_xs = xs[:, block.col0 - pad_col:block.col1]
+        block_ys = ys[block.row0 - pad_row:block.row1]
+        if pad_row or pad_col:
+            labels = label_grid(block_xs, block_ys, angle_grids, ratio_grids, focus_list, pixel_size,
+                                point_list, mirror, stroke_width, dtype=dtype)
+            np.copyto(target, labels[pad_row:, pad_col:])
+        else:
+            label_grid(block_xs, block_ys, angle_grids, ratio_grids, focus_list, pixel_size,
+                       point_list, mirror, stroke_width, target, dtype)
+    return out
 
-    # for boundary in boundaries:
-    #     region_eq = boundary.alg_eq
-    #     G += implicit_plot(region_eq == 0 , [x, x_min, x_max], [y, y_min, y_max], color=bound_col, frame=False)
-    # return G
-    pass
 
+def label_bytes_per_pixel(dtype=np.float64, stroke_width: Optional[float] = None) -> int:
+    """Peak bytes `label_grid` allocates per pixel it labels, without mirrors."""
+    # Three coordinate arrays, the band search positions and the uint8
+    # indices, edge and parity masks; strokes add their float64 distances.
+    size = 3 * np.dtype(dtype).itemsize + np.dtype(np.intp).itemsize + 4
+    if stroke_width is not None:
+        size += 2 * 8
+    return size
 
-def parse_args():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--frame_num", type=int, default=40)
-    parser.add_argument("--plot_points", type=int, default=200)
-    return parser.parse_args()
 
-
-args = parse_args()
-y_range = Range(-6, 6)
-x_range = Range(-6, 6)
-focus1 = Point2D(0, 1)
-focus2 = Point2D(0, -1)
-focus_list = [focus1, focus2]
-p = 6
-plot_points = args.plot_points
+def render_checkerboard(
+    angle_grids: List[Tuple[Num, Num]],
+    ratio_grids: List[Range],
+    focus_list: List[Point2D],
+    x_range: Range,
+    y_range: Range,
+    point_list: List[Point2D] = [],
+    plot_points: int = 200,
+    col_dict: Dict = COL_DICT,
+    bound_col: str = "black",
+    stroke_width: Optional[float] = None,
+) -> np.ndarray:
+    """Same frame as `render_objects(*make_checkerboard(...))`, from `label_checkerboard`."""
+    labels = label_checkerboard(angle_grids, ratio_grids, focus_list, x_range,
+                                y_range, point_list, plot_points,
+                                stroke_width=stroke_width)
+    return colorize(labels, col_dict, bound_col)
+
+
+def render_checkerboard_adaptive(
+    angle_grids: List[Tuple[Num, Num]],
+    ratio_grids: List[Range],
+    focus_list: List[Point2D],
+    x_range: Range,
+    y_range: Range,
+    point_list: List[Point2D] = [],
+    plot_points: int = 200,
+    col_dict: Dict = COL_DICT,
+    bound_col: str = "black",
+    stroke_width: Optional[float] = 1.0,
+    supersample: int = 4,
+) -> np.ndarray:
+    """Anti-aliased RGB frame from `adaptive_frame`, which refines only near the boundaries."""
+    frame = adaptive_frame(angle_grids, ratio_grids, focus_list, x_range, y_range,
+                           plot_points, stroke_width, supersample)
+    xs, ys = make_grid(x_range, y_range, plot_points)
+    pixel_size = (x_range.sup - x_range.inf) / plot_points
+    marker = np.zeros(frame.stroke.shape, dtype=np.uint8)
+    for point in point_list:
+        mark_point(marker, point, xs, ys, 2 * pixel_size, MARKER)
+    frame.stroke[marker != 0] = 1
+    return compose(frame, col_dict, bound_col)
 
 
-def incremented_graph(init_angle: float):
-    angle_grids = get_angle_grids(init_angle=init_angle, p=p)
+@dataclass
+class AnimationConfig:
+    """Everything a worker needs to render one frame of the elliptic animation."""
+    x_range: Range = Range(-6, 6)
+    y_range: Range = Range(-6, 6)
+    focus_list: List[Point2D] = field(
+        default_factory=lambda: [Point2D(0, 1), Point2D(0, -1)])
+    p: int = 6
+    plot_points: int = 200
+    mirror: bool = True
+    stroke_width: Optional[float] = None
+    # Animate this `src.moebius.FAMILIES` member with `moebius_graph` instead.
+    family: Optional[str] = None
+    # "numpy" renders label maps in closed form, "matplotlib" draws RGB frames
+    # with a `MatplotlibRenderer` per worker.
+    backend: str = "numpy"
+    cache_dir: Optional[str] = None
+    cache_size_mb: int = 1024
+
+
+_frame_caches: Dict[Tuple[str, int], FrameCache] = {}
+
+
+def _get_frame_cache(config: AnimationConfig) -> Optional[FrameCache]:
+    if config.cache_dir is None:
+        return None
+    cache_id = (config.cache_dir, config.cache_size_mb)
+    if cache_id not in _frame_caches:
+        _frame_caches[cache_id] = FrameCache(
+            directory=config.cache_dir,
+            max_disk_bytes=config.cache_size_mb * 2**20)
+    return _frame_caches[cache_id]
+
+
+@traced("render_frame")
+def incremented_graph(init_angle: float,
+                      config: AnimationConfig = AnimationConfig(),
+                      out: Optional[np.ndarray] = None) -> np.ndarray:
+    angle_grids = get_angle_grids(init_angle=init_angle, p=config.p)
     ratio_grids = get_ratio_grids()
-    region_list, boundaries = make_checkerboard(angle_grids, ratio_grids,
-                                                focus_list)
-    return render_objects(
-        region_list,
-        boundaries,
-        x_range,
-        y_range,
-        point_list=focus_list,
-        plot_points=plot_points,
+    frame_cache = _get_frame_cache(config)
+    if frame_cache is not None:
+        key = frame_key(angle_grids=angle_grids,
+                        ratio_grids=ratio_grids,
+                        focus_list=config.focus_list,
+                        x_range=config.x_range,
+                        y_range=config.y_range,
+                        plot_points=config.plot_points,
+                        stroke_width=config.stroke_width)
+        with stage("cache_get"):
+            frame = frame_cache.get(key)
+        if frame is not None:
+            if out is None:
+                return frame
+            np.copyto(out, frame)
+            return out
+    frame = label_checkerboard(
+        angle_grids,
+        ratio_grids,
+        config.focus_list,
+        config.x_range,
+        config.y_range,
+        point_list=config.focus_list,
+        plot_points=config.plot_points,
+        mirror=config.mirror,
+        stroke_width=config.stroke_width,
+        out=out,
+    )
+    if frame_cache is not None:
+        with stage("cache_put"):
+            frame_cache.put(key, frame)
+    return frame
+
+
+_moebius_renderers: Dict[Tuple, MoebiusRenderer] = {}
+
+
+@traced("render_frame")
+def moebius_graph(t: float,
+                  config: AnimationConfig = AnimationConfig(),
+                  out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Frame `t` in [0, 1) of the `config.family` loop, from the checkerboard at angle 0."""
+    foci = tuple((focus.x, focus.y) for focus in config.focus_list)
+    renderer_id = (config.x_range, config.y_range, foci, config.p, config.plot_points)
+    if renderer_id not in _moebius_renderers:
+        _moebius_renderers[renderer_id] = MoebiusRenderer(
+            get_angle_grids(p=config.p), get_ratio_grids(), config.focus_list,
+            config.x_range, config.y_range, config.plot_points)
+    transform = family_transforms(config.family, config.focus_list, t)
+    return _moebius_renderers[renderer_id].label(transform, out=out)
+
+
+_matplotlib_renderers: Dict[Tuple, MatplotlibRenderer] = {}
+
+
+@traced("render_frame")
+def matplotlib_graph(init_angle: float, config: AnimationConfig = AnimationConfig()) -> np.ndarray:
+    """RGB frame at `init_angle` drawn by this process's `MatplotlibRenderer`."""
+    foci = tuple((focus.x, focus.y) for focus in config.focus_list)
+    renderer_id = (config.x_range, config.y_range, foci, config.p, config.plot_points)
+    if renderer_id not in _matplotlib_renderers:
+        _matplotlib_renderers[renderer_id] = MatplotlibRenderer(
+            get_ratio_grids(), config.focus_list, config.x_range, config.y_range, COL_DICT,
+            p=config.p, plot_points=config.plot_points)
+    return _matplotlib_renderers[renderer_id].render(
+        get_angle_grids(init_angle=init_angle, p=config.p))
+
+
+def render_animation(config: AnimationConfig,
+                     init_val_list: List[float],
+                     writer: FrameWriter,
+                     shared_memory: bool = False,
+                     store: Optional[FrameStore] = None) -> None:
+    """Renders and encodes the frames at `init_val_list` (angles, or loop parameters
+    of `config.family`).
+
+    With a `store`, every frame is first written into it, skipping those it
+    already holds, and the animation is then encoded from it.
+    """
+    if config.backend == "matplotlib":
+        with Pool(initializer=_init_worker, initargs=(None, trace_spec())) as pool:
+            for i, image in enumerate(
+                    bounded_imap(pool, partial(matplotlib_graph, config=config), init_val_list)):
+                with stage("encode", frame=i):
+                    writer.append(image)
+        return
+
+    # Frames that repeat an earlier one up to a colour swap are not rendered again.
+    with stage("plan"):
+        if config.mirror and config.family is None:
+            plans = plan_frames(
+                [get_angle_grids(init_angle=a, p=config.p) for a in init_val_list])
+        else:
+            plans = [FramePlan(i, False) for i in range(len(init_val_list))]
+    if config.family is None:
+        render = partial(incremented_graph, config=config)
+    else:
+        render = partial(moebius_graph, config=config)
+
+    if store is not None:
+        with Pool(initializer=_init_worker, initargs=(None, trace_spec())) as pool:
+            _fill_store(pool, render, plans, init_val_list, store)
+        _encode_frames(iter(store), writer)
+        return
+
+    plans = limit_retention(plans, config.plot_points**2)
+    render_list = [
+        a for i, (a, plan) in enumerate(zip(init_val_list, plans))
+        if plan.source == i
+    ]
+
+    # Frames come back in order as soon as they are ready and are encoded and
+    # dropped one by one, instead of collecting the whole animation in memory.
+    if shared_memory:
+        frame_shape = (config.plot_points, config.plot_points)
+        with SharedFrameRing(2 * cpu_count(), frame_shape) as ring, \
+                Pool(initializer=_init_worker, initargs=(ring.spec, trace_spec())) as pool:
+            rendered = shared_imap(pool, render, render_list, ring)
+            _encode_frames(replay_frames(plans, rendered), writer)
+    else:
+        with Pool(initializer=_init_worker, initargs=(None, trace_spec())) as pool:
+            rendered = bounded_imap(pool, render, render_list)
+            _encode_frames(replay_frames(plans, rendered), writer)
+
+
+def _fill_store(pool: Pool, render, plans: List[FramePlan], init_val_list: List[float],
+                store: FrameStore) -> None:
+    missing = store.missing()
+    sources = sorted({plans[i].source for i in missing if not store.is_done(plans[i].source)})
+    for _ in fill_store(pool, render, [(i, init_val_list[i]) for i in sources], store):
+        pass
+    # Frames repeating a stored one are derived from it on disk.
+    for i in missing:
+        source, flip = plans[i]
+        if source != i:
+            store.write(i, store[source] ^ PARITY if flip else store[source])
+
+
+def animation_key(config: AnimationConfig, init_val_list: List[float]) -> str:
+    """Hash of everything the label maps of an animation depend on."""
+    return frame_key(x_range=config.x_range,
+                     y_range=config.y_range,
+                     focus_list=config.focus_list,
+                     p=config.p,
+                     plot_points=config.plot_points,
+                     stroke_width=config.stroke_width,
+                     family=config.family,
+                     init_val_list=init_val_list)
+
+
+def _init_worker(ring_spec: Optional[Tuple], trace: Optional[TraceSpec]) -> None:
+    if ring_spec is not None:
+        attach_ring(*ring_spec)
+    if trace is not None:
+        enable_tracing(*trace)
+
+
+def _encode_frames(frames: Iterator[np.ndarray], writer: FrameWriter) -> None:
+    for i in count():
+        # Time spent waiting here is time the workers and IPC are behind the encoder.
+        with stage("wait", frame=i):
+            labels = next(frames, None)
+        if labels is None:
+            break
+        if writer.takes_labels:
+            image = labels
+        else:
+            with stage("colorize", frame=i):
+                image = colorize(labels, COL_DICT)
+        with stage("encode", frame=i):
+            writer.append(image)
+
+
+@traced()
+def render_tile(tile: Tile, init_angle: float, config: AnimationConfig) -> np.ndarray:
+    """Label map of `tile` of the frame at `init_angle`."""
+    return label_checkerboard(
+        get_angle_grids(init_angle=init_angle, p=config.p),
+        get_ratio_grids(),
+        config.focus_list,
+        config.x_range,
+        config.y_range,
+        point_list=config.focus_list,
+        plot_points=config.plot_points,
+        mirror=config.mirror,
+        stroke_width=config.stroke_width,
+        tile=tile,
     )
 
 
-n = args.frame_num
-
-init_val_list = [i / n * pi / 3 for i in range(n)]
+def render_still(config: AnimationConfig,
+                 init_angle: float,
+                 path: Union[str, Path],
+                 tile_size: int = 1024,
+                 processes: Optional[int] = None,
+                 palette: Optional[np.ndarray] = None) -> None:
+    """Renders the single frame at `init_angle` tile by tile on all cores.
+
+    A `.npy` path receives the label map of the frame as a memory-mappable
+    array, so no process holds more than a tile of it. Any other image
+    format is saved with Pillow afterwards as a palette image coloured by
+    `palette` (`label_palette(COL_DICT)` by default), converted to RGB only
+    for formats without palettes, such as JPEG.
+    """
+    path = Path(path)
+    shape = (config.plot_points, config.plot_points)
+    render = partial(render_tile, init_angle=init_angle, config=config)
+    if path.suffix == ".npy":
+        npy_path = path
+    else:
+        fd, tmp_name = tempfile.mkstemp(suffix=".npy", dir=path.parent)
+        os.close(fd)
+        npy_path = Path(tmp_name)
+    try:
+        with Pool(processes, initializer=_init_worker, initargs=(None, trace_spec())) as pool:
+            for _ in render_tiled(pool, render, shape, npy_path, tile_size):
+                pass
+        if npy_path != path:
+            from PIL import Image
+            if palette is None:
+                palette = label_palette(COL_DICT)
+            image = Image.frombytes("P", shape[::-1], np.load(npy_path, mmap_mode="r").tobytes())
+            image.putpalette(np.asarray(palette, dtype=np.uint8).tobytes())
+            if path.suffix.lower() in (".jpg", ".jpeg"):
+                image = image.convert("RGB")
+            image.save(path)
+    finally:
+        if npy_path != path:
+            npy_path.unlink()
+
+
+def render_svg(config: AnimationConfig,
+               init_val_list: List[float],
+               path: Union[str, Path],
+               fps: float = 10,
+               col_dict: Dict = COL_DICT,
+               bound_col: str = "black") -> None:
+    """Vector frames of the angle sweep, whose size depends on the number of cells only.
+
+    A single angle is written as a still SVG and several as one animated SVG,
+    or one SVG per frame if `path` formats the frame number, as in
+    `frames/%04d.svg`.
+    """
+    ratio_grids = get_ratio_grids()
+    angle_grids_list = [get_angle_grids(init_angle=angle, p=config.p) for angle in init_val_list]
+    options = dict(bound_col=bound_col, size=config.plot_points, stroke_width=config.stroke_width or 1.0)
+    if "%" in str(path):
+        for i, angle_grids in enumerate(angle_grids_list):
+            write_svg(str(path) % i, angle_grids, ratio_grids, config.focus_list, config.x_range, config.y_range,
+                      col_dict, **options)
+    elif len(angle_grids_list) == 1:
+        write_svg(path, angle_grids_list[0], ratio_grids, config.focus_list, config.x_range, config.y_range,
+                  col_dict, **options)
+    else:
+        write_animated_svg(path, angle_grids_list, ratio_grids, config.focus_list, config.x_range,
+                           config.y_range, col_dict, fps, **options)
+
+
+_texture_warpers: Dict[Tuple, TextureWarper] = {}
+
+
+def warp_animation(config: AnimationConfig,
+                   images: Sequence[np.ndarray],
+                   init_val_list: List[float],
+                   writers: Sequence[FrameWriter],
+                   wrap: bool = False,
+                   dtype=np.float32) -> None:
+    """Writes every (H, W, 3) image of `images` warped through the `config.family` loop into
+    its writer of `writers`, with the elliptic family by default.
+
+    The images share their remap table of each frame and are sampled in one
+    pass. The tables stay cached in this process for further calls.
+    """
+    stacked = np.stack(images, axis=-1)
+    foci = tuple((focus.x, focus.y) for focus in config.focus_list)
+    warper_id = (config.x_range, config.y_range, foci, config.plot_points, stacked.shape[:2], wrap,
+                 np.dtype(dtype).str)
+    if warper_id not in _texture_warpers:
+        _texture_warpers[warper_id] = TextureWarper(config.x_range, config.y_range, config.plot_points,
+                                                    stacked.shape[:2], wrap=wrap, dtype=dtype)
+    warper = _texture_warpers[warper_id]
+    transforms = family_transforms(config.family or "elliptic", config.focus_list, np.asarray(init_val_list))
+    for i, transform in enumerate(transforms):
+        with stage("remap_table", frame=i):
+            table = warper.table(transform)
+        with stage("warp", frame=i):
+            frames = warp(stacked, table)
+        with stage("encode", frame=i):
+            for k, writer in enumerate(writers):
+                writer.append(frames[..., k])
+
+
+def warp_files(config: AnimationConfig,
+               image_paths: Sequence[Union[str, Path]],
+               output: Union[str, Path],
+               frame_num: int,
+               fps: float,
+               wrap: bool = False,
+               dtype=np.float32) -> None:
+    """`warp_animation` of image files of one size into `output`, or with several,
+    into files named after `output` and each image."""
+    from PIL import Image
+    images = [np.asarray(Image.open(path).convert("RGB")) for path in image_paths]
+    if len({image.shape for image in images}) > 1:
+        raise ValueError("the images to warp must all have the same size")
+    output = Path(output)
+    if len(image_paths) == 1:
+        outputs = [output]
+    else:
+        outputs = [output.with_name(f"{output.stem}-{Path(path).stem}{output.suffix}") for path in image_paths]
+    with ExitStack() as stack:
+        writers = [stack.enter_context(open_writer(path, fps)) for path in outputs]
+        warp_animation(config, images, [i / frame_num for i in range(frame_num)], writers, wrap, dtype)
 
-with Pool() as pool:
-    frames = pool.map(incremented_graph, init_val_list)
-# pool = ProcessPool()
-# frames = list(map(incremented_graph, param_list))
-# plt.show()
 
-# a = animate(frames, xmin=x_range[0], xmax=x_range[1], ymin=y_range[0], ymax=y_range[1], figsize=[6, 6])
-# a.save("moebius-transform-elliptic.gif")
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frame_num", type=int, default=40)
+    parser.add_argument("--plot_points", type=int, default=200)
+    parser.add_argument("--output", default="moebius-transform-elliptic.gif",
+                        help="a .gif is written with Pillow, a .svg as vector graphics (one file per frame if "
+                        "it holds a %%-format such as frames/%%04d.svg), other formats are piped to ffmpeg")
+    parser.add_argument("--fps", type=float, default=10)
+    parser.add_argument("--family", choices=FAMILIES, default=None,
+                        help="animate this family of Moebius transforms by pulling the pixel grid back")
+    parser.add_argument("--backend", choices=["numpy", "matplotlib"], default="numpy",
+                        help="matplotlib draws every frame on a reused figure instead")
+    parser.add_argument("--still", type=float, default=None, metavar="INIT_ANGLE",
+                        help="render only the frame at this angle, split into tiles across all cores")
+    parser.add_argument("--tile_size", type=int, default=1024)
+    parser.add_argument("--warp", nargs="+", default=None, metavar="IMAGE",
+                        help="animate these images pushed through the transforms instead of the checkerboard; "
+                        "several are written next to --output, suffixed with their names")
+    parser.add_argument("--wrap", action="store_true", help="repeat warped images beyond the window")
+    parser.add_argument("--fixed_point", action="store_true",
+                        help="keep the remap tables as 16-bit fixed point, at half the memory")
+    parser.add_argument("--cache_dir", default=None,
+                        help="reuse frames rendered with the same parameters in earlier runs")
+    parser.add_argument("--cache_size_mb", type=int, default=1024)
+    parser.add_argument("--colours", nargs=2, default=[COL_DICT[0], COL_DICT[1]], metavar="COLOUR",
+                        help="colours of the two cell classes; with --store_dir a rerun only re-encodes")
+    parser.add_argument("--bound_colour", default="black")
+    parser.add_argument("--stroke_width", type=float, default=None,
+                        help="draw anti-aliased boundary strokes this many pixels wide")
+    parser.add_argument("--trace", default=None, metavar="PATH",
+                        help="record per-stage wall/CPU time of every process as JSON lines, "
+                        "or as a Chrome trace if PATH ends in .json")
+    parser.add_argument("--trace_memory", action="store_true",
+                        help="also record allocation peaks per stage (slow)")
+    parser.add_argument("--store_dir", default=None,
+                        help="write every frame into a memory-mapped store here first; "
+                        "rerunning an interrupted render resumes from the frames it holds")
+    parser.add_argument("--no_symmetry", action="store_true",
+                        help="render every frame and pixel instead of reusing symmetric ones")
+    parser.add_argument("--shared_memory", action="store_true",
+                        help="render into shared-memory frame slots instead of pickling frames back")
+    args = parser.parse_args(argv)
+    if args.store_dir is not None and args.backend != "numpy":
+        parser.error("--store_dir needs the numpy backend")
+    if args.output.lower().endswith(".svg") and (args.family is not None or args.warp is not None
+                                                 or args.store_dir is not None):
+        parser.error("SVG output cannot be combined with --family, --warp or --store_dir")
+    if args.warp is not None and (args.still is not None or args.store_dir is not None):
+        parser.error("--warp cannot be combined with --still or --store_dir")
+    if args.backend != "numpy" and (args.colours != [COL_DICT[0], COL_DICT[1]] or args.bound_colour != "black"):
+        parser.error("--colours and --bound_colour need the numpy backend")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    config = AnimationConfig(plot_points=args.plot_points,
+                             mirror=not args.no_symmetry,
+                             stroke_width=args.stroke_width,
+                             family=args.family,
+                             backend=args.backend,
+                             cache_dir=args.cache_dir,
+                             cache_size_mb=args.cache_size_mb)
+    if args.trace is not None:
+        enable_tracing(args.trace, chrome=args.trace.endswith(".json"),
+                       memory=args.trace_memory, create=True)
+    palette = label_palette(dict(enumerate(args.colours)), args.bound_colour)
+    try:
+        if args.output.lower().endswith(".svg"):
+            angles = [args.still] if args.still is not None else [
+                i / args.frame_num * pi / 3 for i in range(args.frame_num)
+            ]
+            render_svg(config, angles, args.output, args.fps, dict(enumerate(args.colours)), args.bound_colour)
+            return
+        if args.still is not None:
+            render_still(config, args.still, args.output, tile_size=args.tile_size, palette=palette)
+            return
+        if args.warp is not None:
+            warp_files(config, args.warp, args.output, args.frame_num, args.fps, wrap=args.wrap,
+                       dtype=np.int16 if args.fixed_point else np.float32)
+            return
+        n = args.frame_num
+        if args.family is None:
+            init_val_list = [i / n * pi / 3 for i in range(n)]
+        else:
+            init_val_list = [i / n for i in range(n)]
+        store = None
+        if args.store_dir is not None:
+            store = FrameStore(args.store_dir, n, (config.plot_points, config.plot_points),
+                               key=animation_key(config, init_val_list))
+        # The matplotlib backend draws RGB frames, which have no label map to encode.
+        with open_writer(args.output, args.fps, palette=palette if config.backend == "numpy" else None) as writer:
+            render_animation(config, init_val_list, writer,
+                             shared_memory=args.shared_memory, store=store)
+        if store is not None:
+            store.close()
+    finally:
+        disable_tracing()
+
+
+if __name__ == "__main__":
+    main()
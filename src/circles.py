@@ -1,13 +1,44 @@
-from abc import ABC, abstractproperty
+from abc import ABC, abstractmethod, abstractproperty
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Union
+from functools import lru_cache
+from typing import Any, Callable, Hashable, NamedTuple, Tuple, Union
 
-from numpy import inf
-from sympy import var
+from numpy import inf, ndarray
 
 Num = Union[float, int]
 
-x, y = var("x y")
+
+@lru_cache(maxsize=None)
+def _symbols():
+    # sympy takes ~0.5s to import and is only needed for the symbolic alg_eq.
+    from sympy import var
+    return var("x y")
+
+
+def __getattr__(name: str):
+    if name in ("x", "y"):
+        return _symbols()["xy".index(name)]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Symbolic equations and their compiled kernels, shared by every boundary with
+# the same parameters and orientation (e.g. the same Appolonian circle in
+# every frame). Bounded, since a sweep of init_angle produces new circles.
+_MEMO_SIZE = 4096
+_expressions: "OrderedDict[Hashable, Any]" = OrderedDict()
+_kernels: "OrderedDict[Hashable, Callable]" = OrderedDict()
+
+
+def _memoized(cache: "OrderedDict[Hashable, Any]", key: Hashable,
+              build: Callable[[], Any]) -> Any:
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    value = cache[key] = build()
+    if len(cache) > _MEMO_SIZE:
+        cache.popitem(last=False)
+    return value
 
 
 @dataclass
@@ -16,6 +47,11 @@ class Point2D:
     y: Num
 
 
+class Range(NamedTuple):
+    inf: Num
+    sup: Num
+
+
 # class CharacteristicFunction(ABC):
 #     def __init__(self,
 #                  f: Callable[[Point2D], Num]):
@@ -35,8 +71,31 @@ class Circle(ABC):
     def is_point(self) -> bool:
         raise NotImplementedError
 
-    @abstractproperty
+    @abstractmethod
+    def equation_key(self) -> Tuple:
+        """Identifies `alg_eq`, orientation included."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def _build_alg_eq(self):
+        raise NotImplementedError
+
+    @property
     def alg_eq(self):
+        return _memoized(_expressions, self.equation_key(), self._build_alg_eq)
+
+    @property
+    def kernel(self) -> Callable[[ndarray, ndarray], ndarray]:
+        """`alg_eq` compiled with sympy's lambdify into a NumPy function of (xs, ys)."""
+        def compile_kernel() -> Callable[[ndarray, ndarray], ndarray]:
+            from sympy import lambdify
+            return lambdify(_symbols(), self.alg_eq, "numpy")
+
+        return _memoized(_kernels, self.equation_key(), compile_kernel)
+
+    @abstractmethod
+    def evaluate(self, xs: ndarray, ys: ndarray) -> ndarray:
+        """Numeric counterpart of `alg_eq`, evaluated elementwise on coordinate arrays."""
         raise NotImplementedError
 
 
@@ -53,13 +112,23 @@ class Line(Circle):
     def is_point(self) -> bool:
         return False
 
-    @property
-    def alg_eq(self):
+    def equation_key(self) -> Tuple:
+        return ("Line", self.v.x, self.v.y, self.d, self._insideout)
+
+    def _build_alg_eq(self):
+        x, y = _symbols()
         if self._insideout:
             return -(self.v.x * x + self.v.y * y - self.d)
         else:
             return self.v.x * x + self.v.y * y - self.d
 
+    def evaluate(self, xs: ndarray, ys: ndarray) -> ndarray:
+        values = self.v.x * xs + self.v.y * ys - self.d
+        if self._insideout:
+            return -values
+        else:
+            return values
+
 
 class CanonicalCircle(Circle):
     def __init__(self, centre: Point2D, radius: Num, insideout: bool = False):
@@ -78,13 +147,23 @@ class CanonicalCircle(Circle):
     def is_point(self) -> bool:
         return self.r == 0
 
-    @property
-    def alg_eq(self):
+    def equation_key(self) -> Tuple:
+        return ("CanonicalCircle", self.c.x, self.c.y, self.r, self._insideout)
+
+    def _build_alg_eq(self):
+        x, y = _symbols()
         if self._insideout:
-            return -((x - self.c.x) ** 2 + (y - self.c.x) ** 2 - self.r ** 2)
+            return -((x - self.c.x) ** 2 + (y - self.c.y) ** 2 - self.r ** 2)
         else:
             return (x - self.c.x) ** 2 + (y - self.c.y) ** 2 - self.r ** 2
 
+    def evaluate(self, xs: ndarray, ys: ndarray) -> ndarray:
+        values = (xs - self.c.x) ** 2 + (ys - self.c.y) ** 2 - self.r ** 2
+        if self._insideout:
+            return -values
+        else:
+            return values
+
 
 class AppolonianCircle(Circle):
     def __init__(self, focus1: Point2D, focus2: Point2D, ratio: Num):
@@ -96,8 +175,11 @@ class AppolonianCircle(Circle):
     def is_point(self):
         return self.r == 0 or self.r is inf
 
-    @property
-    def alg_eq(self):
+    def equation_key(self) -> Tuple:
+        return ("AppolonianCircle", self.f1.x, self.f1.y, self.f2.x, self.f2.y, self.r)
+
+    def _build_alg_eq(self):
+        x, y = _symbols()
         if self.r == 0:
             return (x - self.f1.x) ** 2 + (y - self.f1.y) ** 2
         elif self.r is inf:
@@ -108,3 +190,28 @@ class AppolonianCircle(Circle):
                 + (y - self.f1.y) ** 2
                 - self.r * ((x - self.f2.x) ** 2 + (y - self.f2.y) ** 2)
             )
+
+    def evaluate(self, xs: ndarray, ys: ndarray) -> ndarray:
+        if self.r == 0:
+            return (xs - self.f1.x) ** 2 + (ys - self.f1.y) ** 2
+        elif self.r is inf:
+            return (xs - self.f2.x) ** 2 + (ys - self.f2.y) ** 2
+        else:
+            return (
+                (xs - self.f1.x) ** 2
+                + (ys - self.f1.y) ** 2
+                - self.r * ((xs - self.f2.x) ** 2 + (ys - self.f2.y) ** 2)
+            )
+
+
+class Inequality(NamedTuple):
+    """`sign * boundary.alg_eq > 0`, kept numeric so it can be rasterized without sympy."""
+    boundary: Circle
+    sign: int
+
+    @property
+    def alg_ineq(self):
+        return self.sign * self.boundary.alg_eq > 0
+
+    def evaluate(self, xs: ndarray, ys: ndarray) -> ndarray:
+        return self.sign * self.boundary.evaluate(xs, ys) > 0
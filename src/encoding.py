@@ -0,0 +1,204 @@
+import shutil
+import subprocess
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+import numpy as np
+
+PathLike = Union[str, Path]
+
+
+class FrameWriter(ABC):
+    """Encodes frames one at a time as they are appended, so only one is held in memory.
+
+    Frames are (H, W, 3) uint8 RGB, or with a `palette`, the (256, 3) uint8
+    colour of every label value (`src.raster.label_palette`), (H, W) uint8
+    label maps that only take their colours here.
+    """
+    def __init__(self, path: PathLike, fps: float, palette: Optional[np.ndarray] = None):
+        self.path = Path(path)
+        self.fps = fps
+        self.palette = None if palette is None else np.asarray(palette, dtype=np.uint8).reshape(256, 3)
+        self.frame_count = 0
+
+    @property
+    def takes_labels(self) -> bool:
+        return self.palette is not None
+
+    def _to_rgb(self, frame: np.ndarray) -> np.ndarray:
+        if self.palette is None:
+            return frame
+        return np.take(self.palette, frame, axis=0)
+
+    @abstractmethod
+    def append(self, frame: np.ndarray) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def close(self) -> None:
+        raise NotImplementedError
+
+    def __enter__(self) -> "FrameWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+class GifWriter(FrameWriter):
+    """Streams frames into an endlessly looping GIF using Pillow."""
+    def __init__(self, path: PathLike, fps: float, loop: int = 0, palette: Optional[np.ndarray] = None):
+        super().__init__(path, fps, palette)
+        self.loop = loop
+        self._file: Optional[BinaryIO] = None
+
+    def _to_image(self, frame: np.ndarray):
+        from PIL import Image
+        # Checkerboard frames only hold a handful of colours, so the adaptive
+        # palette is exact.
+        return Image.fromarray(self._to_rgb(frame), mode="RGB").convert("P",
+                                                          palette=Image.ADAPTIVE)
+
+    def append(self, frame: np.ndarray) -> None:
+        from PIL import GifImagePlugin
+        image = self._to_image(frame)
+        if self._file is None:
+            self._file = open(self.path, "wb")
+            header, _ = GifImagePlugin.getheader(image, info={"loop": self.loop})
+            for chunk in header:
+                self._file.write(chunk)
+        for chunk in GifImagePlugin.getdata(image,
+                                            duration=1000 / self.fps,
+                                            include_color_table=True):
+            self._file.write(chunk)
+        self.frame_count += 1
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.write(b";")
+            self._file.close()
+            self._file = None
+
+
+class DeltaGifWriter(FrameWriter):
+    """Streams (H, W) uint8 label maps into a GIF that only stores what changed.
+
+    Label values are used as palette indices directly, so `palette` is the
+    (256, 3) uint8 colour of every label value (`src.raster.label_palette`)
+    and is written once as the global colour table. Each frame after the
+    first is cropped to the bounding box of the labels that differ from the
+    previous frame and drawn over it, with the unchanged pixels inside the
+    box set to an index the frame does not otherwise use and marked
+    transparent, which also leaves long runs for LZW to compress.
+    """
+    def __init__(self, path: PathLike, fps: float, palette: np.ndarray, loop: int = 0):
+        super().__init__(path, fps, palette)
+        self.loop = loop
+        self._file: Optional[BinaryIO] = None
+        self._previous: Optional[np.ndarray] = None
+
+    def _to_image(self, indices: np.ndarray):
+        from PIL import Image
+        height, width = indices.shape
+        image = Image.frombytes("P", (width, height), np.ascontiguousarray(indices, dtype=np.uint8).tobytes())
+        image.putpalette(self.palette.tobytes())
+        return image
+
+    def append(self, frame: np.ndarray) -> None:
+        from PIL import GifImagePlugin
+        params = {"duration": 1000 / self.fps, "disposal": 1}
+        if self._previous is None:
+            image = self._to_image(frame)
+            self._file = open(self.path, "wb")
+            header, _ = GifImagePlugin.getheader(image, info={"loop": self.loop})
+            for chunk in header:
+                self._file.write(chunk)
+            offset = (0, 0)
+        else:
+            image, offset, transparency = self._delta(self._previous, frame)
+            if transparency is not None:
+                params["transparency"] = transparency
+        for chunk in GifImagePlugin.getdata(image, offset=offset, **params):
+            self._file.write(chunk)
+        self._previous = np.array(frame, dtype=np.uint8)
+        self.frame_count += 1
+
+    def _delta(self, previous: np.ndarray, frame: np.ndarray):
+        changed = previous != frame
+        rows = np.flatnonzero(changed.any(axis=1))
+        if len(rows) == 0:
+            # A GIF frame needs at least one pixel; keep the one at the origin.
+            transparency = (int(frame[0, 0]) + 1) % 256
+            return self._to_image(np.array([[transparency]], dtype=np.uint8)), (0, 0), transparency
+        cols = np.flatnonzero(changed.any(axis=0))
+        window = (slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1))
+        indices = np.array(frame[window], dtype=np.uint8)
+        changed = changed[window]
+        unused = np.flatnonzero(np.bincount(indices[changed], minlength=256) == 0)
+        if len(unused) == 0:
+            return self._to_image(indices), (int(cols[0]), int(rows[0])), None
+        transparency = int(unused[0])
+        indices[~changed] = transparency
+        return self._to_image(indices), (int(cols[0]), int(rows[0])), transparency
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.write(b";")
+            self._file.close()
+            self._file = None
+
+
+class FFmpegWriter(FrameWriter):
+    """Pipes raw RGB frames into a local ffmpeg process; the container follows the file suffix."""
+    def __init__(self, path: PathLike, fps: float, ffmpeg: str = "ffmpeg", palette: Optional[np.ndarray] = None):
+        super().__init__(path, fps, palette)
+        executable = shutil.which(ffmpeg)
+        if executable is None:
+            raise FileNotFoundError(
+                f"ffmpeg is required to write {self.path.suffix} files but was not found on PATH"
+            )
+        self.ffmpeg = executable
+        self._process: Optional[subprocess.Popen] = None
+
+    def _start(self, height: int, width: int) -> subprocess.Popen:
+        return subprocess.Popen(
+            [
+                self.ffmpeg, "-loglevel", "error", "-y",
+                "-f", "rawvideo", "-pix_fmt", "rgb24",
+                "-s", f"{width}x{height}", "-r", str(self.fps),
+                "-i", "-",
+                # yuv420p needs even dimensions.
+                "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+                "-pix_fmt", "yuv420p",
+                str(self.path),
+            ],
+            stdin=subprocess.PIPE,
+        )
+
+    def append(self, frame: np.ndarray) -> None:
+        if self._process is None:
+            self._process = self._start(*frame.shape[:2])
+        self._process.stdin.write(np.ascontiguousarray(self._to_rgb(frame), dtype=np.uint8).tobytes())
+        self.frame_count += 1
+
+    def close(self) -> None:
+        if self._process is not None:
+            self._process.stdin.close()
+            returncode = self._process.wait()
+            self._process = None
+            if returncode != 0:
+                raise RuntimeError(f"ffmpeg exited with status {returncode}")
+
+
+def open_writer(path: PathLike, fps: float, palette: Optional[np.ndarray] = None) -> FrameWriter:
+    """GIFs are written with Pillow, every other format through ffmpeg.
+
+    Given the `palette` of the label maps to be appended, a GIF is written
+    from them with `DeltaGifWriter`.
+    """
+    if Path(path).suffix.lower() == ".gif":
+        if palette is not None:
+            return DeltaGifWriter(path, fps, palette)
+        return GifWriter(path, fps)
+    return FFmpegWriter(path, fps, palette=palette)
@@ -0,0 +1,208 @@
+import io
+import threading
+from collections import OrderedDict
+from functools import partial
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+from numpy import pi
+
+from src.checkerboard import COL_DICT, get_angle_grids, get_ratio_grids, label_checkerboard
+from src.circles import Point2D, Range
+from src.raster import label_palette
+from src.tiling import Tile, split_tiles
+
+
+class ExplorerParams(NamedTuple):
+    init_angle: float = 0.0
+    p: int = 6
+    # Logarithmic distance between the ratio bounds, 0.5 in `get_ratio_grids`.
+    ratio_spacing: float = 0.5
+    focus1: Tuple[float, float] = (0.0, 1.0)
+    focus2: Tuple[float, float] = (0.0, -1.0)
+
+
+def label_frame(params: ExplorerParams,
+                plot_points: int,
+                x_range: Range = Range(-6, 6),
+                y_range: Range = Range(-6, 6),
+                tile: Optional[Tile] = None) -> np.ndarray:
+    """Label map of the checkerboard of `params`, or of one tile of it."""
+    focus_list = [Point2D(*params.focus1), Point2D(*params.focus2)]
+    return label_checkerboard(get_angle_grids(init_angle=params.init_angle, p=params.p),
+                              get_ratio_grids(spacing=params.ratio_spacing), focus_list, x_range, y_range,
+                              focus_list, plot_points, tile=tile)
+
+
+class ProgressiveRenderer:
+    """Shows a coarse frame at once and the full frame when a background thread has it.
+
+    `update` labels the frame at `preview_points` on the calling thread and
+    passes it to `show`, then hands the full `plot_points` frame to the
+    thread. The thread labels it tile by tile and drops it as soon as a newer
+    `update` arrives, so it never works on stale parameters for longer than
+    one tile. The last `cache_size` label maps of either size are kept, and
+    parameters seen before show their full frame without rendering anything.
+    """
+    def __init__(self,
+                 label: Callable[..., np.ndarray],
+                 show: Callable[[np.ndarray], None],
+                 plot_points: int = 600,
+                 preview_points: int = 120,
+                 tile_size: int = 150,
+                 cache_size: int = 64):
+        self.label = label
+        self.show = show
+        self.plot_points = plot_points
+        self.preview_points = preview_points
+        self.tile_size = tile_size
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._show_lock = threading.Lock()
+        self._generation = 0
+        self._pending: Optional[ExplorerParams] = None
+        self._busy = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._refine_loop, daemon=True)
+        self._thread.start()
+
+    def _cached(self, key: Tuple) -> Optional[np.ndarray]:
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            return None
+
+    def _remember(self, key: Tuple, labels: np.ndarray) -> None:
+        with self._lock:
+            self._cache[key] = labels
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def update(self, params) -> None:
+        with self._changed:
+            # Cancels the refinement under way.
+            self._generation += 1
+            self._pending = None
+        full = self._cached((params, self.plot_points))
+        if full is not None:
+            self._show(full)
+            return
+        preview_key = (params, self.preview_points)
+        preview = self._cached(preview_key)
+        if preview is None:
+            preview = self.label(params, self.preview_points)
+            self._remember(preview_key, preview)
+        self._show(preview)
+        with self._changed:
+            self._pending = params
+            self._changed.notify_all()
+
+    def _show(self, labels: np.ndarray, generation: Optional[int] = None) -> None:
+        # Serialized, so a refinement finishing during an update cannot be
+        # shown after the newer preview.
+        with self._show_lock:
+            if generation is None or generation == self._generation:
+                self.show(labels)
+
+    def _refine_loop(self) -> None:
+        while True:
+            with self._changed:
+                self._busy = False
+                self._changed.notify_all()
+                self._changed.wait_for(lambda: self._pending is not None or self._closed)
+                if self._closed:
+                    return
+                params, generation = self._pending, self._generation
+                self._pending = None
+                self._busy = True
+            labels = self._refine(params, generation)
+            if labels is not None:
+                self._remember((params, self.plot_points), labels)
+                self._show(labels, generation)
+
+    def _refine(self, params, generation: int) -> Optional[np.ndarray]:
+        labels = np.empty((self.plot_points, self.plot_points), dtype=np.uint8)
+        for tile in split_tiles(self.plot_points, self.plot_points, self.tile_size):
+            if generation != self._generation:
+                return None
+            labels[tile.index] = self.label(params, self.plot_points, tile=tile)
+        return labels
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Waits until the thread has nothing left to refine; False on timeout."""
+        with self._changed:
+            return self._changed.wait_for(lambda: self._pending is None and not self._busy, timeout)
+
+    def close(self) -> None:
+        with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+        self._thread.join()
+
+
+def png_bytes(labels: np.ndarray, palette: np.ndarray) -> bytes:
+    from PIL import Image
+    image = Image.frombytes("P", labels.shape[::-1], np.ascontiguousarray(labels).tobytes())
+    image.putpalette(palette.tobytes())
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+class Explorer:
+    """ipywidgets sliders for the angle, p, ratio spacing and foci over a live checkerboard.
+
+    Display it as the last expression of a notebook cell. The coarse preview
+    is upscaled by the browser until the full frame replaces it.
+    """
+    def __init__(self,
+                 plot_points: int = 600,
+                 preview_points: int = 120,
+                 x_range: Range = Range(-6, 6),
+                 y_range: Range = Range(-6, 6),
+                 col_dict: Dict = COL_DICT,
+                 bound_col: str = "black"):
+        import ipywidgets as widgets
+
+        self.palette = label_palette(col_dict, bound_col)
+        self.image = widgets.Image(format="png", width=plot_points, height=plot_points)
+        self.image.layout.object_fit = "fill"
+        self.sliders = {
+            "init_angle": widgets.FloatSlider(value=0, min=0, max=pi, step=0.005, description="angle"),
+            "p": widgets.IntSlider(value=6, min=1, max=24, description="p"),
+            "ratio_spacing": widgets.FloatSlider(value=0.5, min=0.05, max=2, step=0.05, description="ratio step"),
+            "focus1_x": widgets.FloatSlider(value=0, min=-5, max=5, step=0.05, description="focus 1 x"),
+            "focus1_y": widgets.FloatSlider(value=1, min=-5, max=5, step=0.05, description="focus 1 y"),
+            "focus2_x": widgets.FloatSlider(value=0, min=-5, max=5, step=0.05, description="focus 2 x"),
+            "focus2_y": widgets.FloatSlider(value=-1, min=-5, max=5, step=0.05, description="focus 2 y"),
+        }
+        for slider in self.sliders.values():
+            slider.observe(self._changed, names="value")
+        self.renderer = ProgressiveRenderer(partial(label_frame, x_range=x_range, y_range=y_range), self._show,
+                                            plot_points=plot_points, preview_points=preview_points)
+        self.widget = widgets.HBox([widgets.VBox(list(self.sliders.values())), self.image])
+        self._changed()
+
+    def params(self) -> ExplorerParams:
+        values = {name: slider.value for name, slider in self.sliders.items()}
+        return ExplorerParams(values["init_angle"], values["p"], values["ratio_spacing"],
+                              (values["focus1_x"], values["focus1_y"]), (values["focus2_x"], values["focus2_y"]))
+
+    def _changed(self, change=None) -> None:
+        params = self.params()
+        if params.focus1 != params.focus2:
+            self.renderer.update(params)
+
+    def _show(self, labels: np.ndarray) -> None:
+        self.image.value = png_bytes(labels, self.palette)
+
+    def _ipython_display_(self) -> None:
+        from IPython.display import display
+        display(self.widget)
+
+    def close(self) -> None:
+        self.renderer.close()
+        self.widget.close()
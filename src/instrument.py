@@ -0,0 +1,182 @@
+import json
+import os
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class TraceSpec(NamedTuple):
+    """Where and how a process records its stages; `initargs` for `enable_tracing` in pool workers."""
+    path: str
+    chrome: bool = False
+    memory: bool = False
+
+
+class _Stage:
+    __slots__ = ("tracer", "name", "args", "wall", "cpu", "alloc_base", "alloc_peak")
+
+    def __init__(self, tracer: "Tracer", name: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self) -> "_Stage":
+        self.tracer._enter(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.tracer._exit(self)
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Tracer:
+    """Records the wall time, CPU time and (optionally) allocation peak of every stage.
+
+    Events are appended to `spec.path` one line per `os.write` on an O_APPEND
+    descriptor, so every process of a pool can trace into the same file. As
+    JSON lines each event is an object; as a Chrome trace (`spec.chrome`) the
+    file is a JSON array of complete ("X") events, whose closing bracket the
+    trace viewers do not require. Allocation peaks come from `tracemalloc`,
+    which numpy reports its buffers to, and slow everything down.
+    """
+    def __init__(self, spec: TraceSpec, create: bool = False):
+        self.spec = spec
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT | (os.O_TRUNC if create else 0)
+        self._fd = os.open(spec.path, flags, 0o644)
+        if create and spec.chrome:
+            os.write(self._fd, b"[\n")
+        self._stack: List[_Stage] = []
+        self._started_tracemalloc = False
+        if spec.memory:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+
+    def stage(self, name: str, **args: Any) -> _Stage:
+        return _Stage(self, name, args)
+
+    def _enter(self, stage: _Stage) -> None:
+        if self.spec.memory:
+            import tracemalloc
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                parent = self._stack[-1]
+                parent.alloc_peak = max(parent.alloc_peak, peak)
+            stage.alloc_base = stage.alloc_peak = current
+            _reset_peak()
+        self._stack.append(stage)
+        stage.cpu = time.process_time()
+        stage.wall = time.perf_counter()
+
+    def _exit(self, stage: _Stage) -> None:
+        wall = time.perf_counter() - stage.wall
+        cpu = time.process_time() - stage.cpu
+        self._stack.pop()
+        event: Dict[str, Any] = dict(stage.args, stage=stage.name, pid=os.getpid(),
+                                     tid=threading.get_ident(), start=stage.wall,
+                                     wall_s=wall, cpu_s=cpu)
+        if self.spec.memory:
+            import tracemalloc
+            peak = max(stage.alloc_peak, tracemalloc.get_traced_memory()[1])
+            event["alloc_peak_bytes"] = peak - stage.alloc_base
+            if self._stack:
+                parent = self._stack[-1]
+                parent.alloc_peak = max(parent.alloc_peak, peak)
+            _reset_peak()
+        self._write(event)
+
+    def _write(self, event: Dict[str, Any]) -> None:
+        if self.spec.chrome:
+            args = {k: v for k, v in event.items() if k not in ("stage", "pid", "tid", "start", "wall_s")}
+            event = {
+                "name": event["stage"],
+                "ph": "X",
+                "ts": event["start"] * 1e6,
+                "dur": event["wall_s"] * 1e6,
+                "pid": event["pid"],
+                "tid": event["tid"],
+                "args": args,
+            }
+            line = json.dumps(event) + ",\n"
+        else:
+            line = json.dumps(event) + "\n"
+        os.write(self._fd, line.encode())
+
+    def close(self) -> None:
+        os.close(self._fd)
+        if self._started_tracemalloc:
+            import tracemalloc
+            tracemalloc.stop()
+
+
+def _reset_peak() -> None:
+    import tracemalloc
+    # Python 3.9+; before that the peak is only ever raised, which makes the
+    # recorded peaks upper bounds.
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+
+
+_tracer: Optional[Tracer] = None
+
+
+def enable_tracing(path: str, chrome: bool = False, memory: bool = False, create: bool = False) -> None:
+    """Starts recording stages of this process into `path`; `create` truncates it first."""
+    global _tracer
+    disable_tracing()
+    _tracer = Tracer(TraceSpec(path, chrome, memory), create=create)
+
+
+def disable_tracing() -> None:
+    global _tracer
+    if _tracer is not None:
+        _tracer.close()
+        _tracer = None
+
+
+def trace_spec() -> Optional[TraceSpec]:
+    """The spec of the active tracer, to enable the same tracing in pool workers."""
+    return _tracer.spec if _tracer is not None else None
+
+
+def stage(name: str, **args: Any):
+    """Context manager timing the enclosed block as `name`, with `args` added to its event.
+
+    Costs one global lookup when tracing is disabled.
+    """
+    if _tracer is None:
+        return _NULL_STAGE
+    return _tracer.stage(name, **args)
+
+
+def traced(name: Optional[str] = None) -> Callable[[F], F]:
+    """Decorator recording every call of the function as a stage (named after it by default)."""
+    def decorator(func: F) -> F:
+        stage_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with _tracer.stage(stage_name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore
+
+    return decorator
@@ -0,0 +1,96 @@
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from src.batch import CIRCLE, LINE, frame_boundaries
+from src.circles import Num, Point2D, Range
+from src.raster import PARITY, Colour, make_grid, to_rgb
+from src.symmetry import mirrored_label_cells
+
+Grids = Sequence[Tuple[Num, Num]]
+
+
+class MatplotlibRenderer:
+    """Draws checkerboard frames with matplotlib, building the figure and its artists once.
+
+    The cells are a figure image and every boundary has a circle patch and
+    a line artist, of which the one matching its current kind is shown. A
+    frame only swaps the image data and moves the boundary artists before the
+    Agg canvas is redrawn and its buffer copied out. Blitting would not save
+    anything here, since the image under every other artist changes each frame.
+    """
+    def __init__(self,
+                 ratio_grids: Grids,
+                 focus_list: List[Point2D],
+                 x_range: Range,
+                 y_range: Range,
+                 col_dict: Dict,
+                 p: int = 6,
+                 plot_points: int = 200,
+                 bound_col: Colour = "black",
+                 linewidth: float = 1.0,
+                 dpi: int = 100):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        from matplotlib.lines import Line2D
+        from matplotlib.patches import Circle as CirclePatch
+
+        self.ratio_grids = ratio_grids
+        self.focus_list = focus_list
+        self.x_range = x_range
+        self.y_range = y_range
+        self.plot_points = plot_points
+        self.xs, self.ys = make_grid(x_range, y_range, plot_points)
+        bound_rgb = np.array(to_rgb(bound_col)) / 255
+
+        self.figure = Figure(figsize=(plot_points / dpi, plot_points / dpi), dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        ax = self.figure.add_axes([0, 0, 1, 1])
+        ax.set_axis_off()
+        ax.set_xlim(x_range.inf, x_range.sup)
+        ax.set_ylim(y_range.inf, y_range.sup)
+        # Cells are handed over as RGBA bytes, which skip the colour mapping, in
+        # a figure image, which is copied onto the canvas without resampling.
+        self._palette = np.full((2, 4), 255, dtype=np.uint8)
+        self._palette[:, :3] = [to_rgb(col_dict[key]) for key in (0, 1)]
+        self.image = self.figure.figimage(np.zeros((plot_points, plot_points, 4), dtype=np.uint8),
+                                          origin="upper",
+                                          zorder=-1)
+        boundary_count = p + len(ratio_grids) + 1
+        self.circles = [
+            ax.add_patch(CirclePatch((0, 0), 1, fill=False, edgecolor=bound_rgb, linewidth=linewidth))
+            for _ in range(boundary_count)
+        ]
+        self.lines = [
+            ax.add_line(Line2D([], [], color=bound_rgb, linewidth=linewidth))
+            for _ in range(boundary_count)
+        ]
+        ax.plot([focus.x for focus in focus_list], [focus.y for focus in focus_list], "o",
+                color=bound_rgb, markersize=4 * linewidth)
+        # Half length of the segments drawn for lines, long enough to cross the
+        # window from the foot of any line that meets it.
+        self._line_length = 2 * sum(abs(bound) for bound in (*x_range, *y_range))
+
+    def render(self, angle_grids: Grids) -> np.ndarray:
+        """(plot_points, plot_points, 3) uint8 RGB frame for `angle_grids`."""
+        angle_index, ratio_index = mirrored_label_cells(self.xs, self.ys, angle_grids, self.ratio_grids,
+                                                        self.focus_list)
+        self.image.set_data(self._palette[(angle_index + ratio_index) & PARITY])
+
+        boundaries = frame_boundaries(angle_grids, self.ratio_grids, self.focus_list)
+        for i, (circle, line) in enumerate(zip(self.circles, self.lines)):
+            kind = boundaries.kind[i]
+            circle.set_visible(kind == CIRCLE)
+            line.set_visible(kind == LINE)
+            if kind == CIRCLE:
+                circle.set_center((boundaries.centre_x[i], boundaries.centre_y[i]))
+                circle.set_radius(boundaries.radius[i])
+            elif kind == LINE:
+                normal = np.array([boundaries.normal_x[i], boundaries.normal_y[i]])
+                foot = normal * boundaries.offset[i]
+                along = np.array([-normal[1], normal[0]]) * self._line_length
+                line.set_data([foot[0] - along[0], foot[0] + along[0]],
+                              [foot[1] - along[1], foot[1] + along[1]])
+
+        self.canvas.draw()
+        return np.asarray(self.canvas.buffer_rgba())[..., :3].copy()
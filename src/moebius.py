@@ -0,0 +1,202 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy import pi
+
+from src.bipolar import band_index
+from src.circles import Num, Point2D, Range
+from src.raster import BOUNDARY, MARKER, PARITY, edge_mask, make_grid, mark_point
+
+# Values of `classify`
+ELLIPTIC = 0
+PARABOLIC = 1
+HYPERBOLIC = 2
+LOXODROMIC = 3
+
+FAMILIES = ("elliptic", "hyperbolic", "loxodromic", "parabolic")
+
+Grids = Sequence[Tuple[Num, Num]]
+
+# Transforms are (..., 2, 2) complex arrays [[a, b], [c, d]] acting as
+# z -> (a z + b) / (c z + d), composed by matrix product (`a @ b` applies b
+# first) and defined up to a scalar factor.
+
+
+def identity(shape: Tuple[int, ...] = ()) -> np.ndarray:
+    return np.broadcast_to(np.eye(2, dtype=complex), shape + (2, 2)).copy()
+
+
+def normalize(m: np.ndarray) -> np.ndarray:
+    """The same transforms scaled to determinant 1."""
+    m = np.asarray(m, dtype=complex)
+    return m / np.sqrt(np.linalg.det(m))[..., np.newaxis, np.newaxis]
+
+
+def inverse(m: np.ndarray) -> np.ndarray:
+    """Adjugate of every matrix, which is the inverse transform."""
+    m = np.asarray(m, dtype=complex)
+    res = np.empty_like(m)
+    res[..., 0, 0] = m[..., 1, 1]
+    res[..., 0, 1] = -m[..., 0, 1]
+    res[..., 1, 0] = -m[..., 1, 0]
+    res[..., 1, 1] = m[..., 0, 0]
+    return res
+
+
+def apply(m: np.ndarray, zs: np.ndarray) -> np.ndarray:
+    """(a z + b) / (c z + d) for one transform `m` and every point of `zs`; poles map to inf."""
+    (a, b), (c, d) = m
+    numerator = a * zs + b
+    denominator = c * zs + d
+    with np.errstate(divide="ignore", invalid="ignore"):
+        res = numerator / denominator
+    res[denominator == 0] = np.inf
+    return res
+
+
+def trace_squared(m: np.ndarray) -> np.ndarray:
+    """tr^2 / det, which determines the conjugacy class of the transform."""
+    m = np.asarray(m, dtype=complex)
+    return np.trace(m, axis1=-2, axis2=-1)**2 / np.linalg.det(m)
+
+
+def classify(m: np.ndarray, tol: float = 1e-9) -> np.ndarray:
+    """ELLIPTIC, PARABOLIC, HYPERBOLIC or LOXODROMIC for every transform (the identity counts as
+    parabolic)."""
+    t2 = trace_squared(m)
+    real = np.abs(t2.imag) <= tol
+    kind = np.full(t2.shape, LOXODROMIC, dtype=np.uint8)
+    kind[real & (t2.real < 4 - tol) & (t2.real >= 0)] = ELLIPTIC
+    kind[real & (np.abs(t2.real - 4) <= tol)] = PARABOLIC
+    kind[real & (t2.real > 4 + tol)] = HYPERBOLIC
+    return kind
+
+
+def fixed_point_transforms(focus1: Point2D, focus2: Point2D, multipliers: np.ndarray) -> np.ndarray:
+    """Transforms fixing `focus1` and `focus2` with multiplier k at `focus1`.
+
+    With w = (z - f1) / (z - f2), which sends the foci to 0 and inf, they are
+    w -> k w: |k| = 1 is elliptic, a positive k hyperbolic and any other k
+    loxodromic.
+    """
+    f1, f2 = complex(focus1.x, focus1.y), complex(focus2.x, focus2.y)
+    multipliers = np.asarray(multipliers, dtype=complex)
+    to_model = np.array([[1, -f1], [1, -f2]], dtype=complex)
+    scale = np.zeros(multipliers.shape + (2, 2), dtype=complex)
+    scale[..., 0, 0] = multipliers
+    scale[..., 1, 1] = 1
+    return normalize(inverse(to_model) @ scale @ to_model)
+
+
+def elliptic(focus1: Point2D, focus2: Point2D, angles: np.ndarray) -> np.ndarray:
+    """Rotations by `angles` about the two foci."""
+    return fixed_point_transforms(focus1, focus2, np.exp(1j * np.asarray(angles, dtype=float)))
+
+
+def hyperbolic(focus1: Point2D, focus2: Point2D, log_scales: np.ndarray) -> np.ndarray:
+    """Flows from `focus2` to `focus1` scaling w by exp(log_scales)."""
+    return fixed_point_transforms(focus1, focus2, np.exp(np.asarray(log_scales, dtype=float)))
+
+
+def parabolic(fixed_point: Point2D, translations: np.ndarray) -> np.ndarray:
+    """Transforms fixing only `fixed_point`: 1 / (z - f) -> 1 / (z - f) + t."""
+    f = complex(fixed_point.x, fixed_point.y)
+    translations = np.asarray(translations, dtype=complex)
+    res = np.empty(translations.shape + (2, 2), dtype=complex)
+    res[..., 0, 0] = 1 + translations * f
+    res[..., 0, 1] = -translations * f * f
+    res[..., 1, 0] = translations
+    res[..., 1, 1] = 1 - translations * f
+    return res
+
+
+def power(m: np.ndarray, ts: np.ndarray) -> np.ndarray:
+    """m^t for one transform and every t in `ts`, along the one-parameter group through m.
+
+    By Sylvester's formula M^t = (l1^t (M - l2) - l2^t (M - l1)) / (l1 - l2)
+    for the eigenvalues l1, l2 of the normalized matrix; a parabolic M = +-(I + N)
+    has M^t = I + t N up to sign.
+    """
+    m = normalize(m)
+    ts = np.asarray(ts, dtype=float)[..., np.newaxis, np.newaxis]
+    eye = np.eye(2, dtype=complex)
+    half_trace = np.trace(m) / 2
+    root = np.sqrt(half_trace**2 - 1)
+    if abs(root) < 1e-9:
+        return eye + ts * (m / half_trace - eye)
+    l1, l2 = half_trace + root, half_trace - root
+    return (l1**ts * (m - l2 * eye) - l2**ts * (m - l1 * eye)) / (l1 - l2)
+
+
+def interpolate(m0: np.ndarray, m1: np.ndarray, ts: np.ndarray) -> np.ndarray:
+    """Transforms moving from `m0` (t = 0) to `m1` (t = 1) along (m1 m0^-1)^t m0."""
+    return power(normalize(m1) @ inverse(normalize(m0)), ts) @ normalize(m0)
+
+
+def family_transforms(family: str, focus_list: List[Point2D], ts: np.ndarray) -> np.ndarray:
+    """One loop of a standard animation for `ts` in [0, 1).
+
+    Each loop moves the checkerboard by two bands, so the last frame leads
+    back into the first: the angle bands of `get_angle_grids` (p = 6) for the
+    elliptic family, the ratio bands of `get_ratio_grids` for the hyperbolic
+    one (except the two outermost, which have no neighbours to take over) and
+    both at once for the loxodromic one. The parabolic family translates by
+    one unit in 1 / (z - f1) and does not loop.
+    """
+    focus1, focus2 = focus_list
+    ts = np.asarray(ts, dtype=float)
+    if family == "elliptic":
+        # Rotating backwards moves the bands forwards, as in `incremented_graph(t pi / 3)`.
+        return elliptic(focus1, focus2, -ts * pi / 3)
+    elif family == "hyperbolic":
+        # The ratio |z - f1|^2 / |z - f2|^2 is |w|^2 and its bands are exp(0.5) apart.
+        return hyperbolic(focus1, focus2, ts / 2)
+    elif family == "loxodromic":
+        return fixed_point_transforms(focus1, focus2, np.exp(ts / 2 - 1j * ts * pi / 3))
+    elif family == "parabolic":
+        return parabolic(focus1, ts)
+    raise ValueError(f"unknown family: {family}")
+
+
+class MoebiusRenderer:
+    """Renders a fixed checkerboard moved by arbitrary Möbius transforms.
+
+    The pixel grid is built once as complex numbers. A frame is labelled by
+    pulling every pixel back through the inverse transform into the model
+    plane w = (z - f2) / (z - f1) of the checkerboard, where its bipolar
+    angle is arg(w) mod pi and its ratio 1 / |w|^2, so the whole frame costs
+    one complex division per pixel ahead of the band lookup.
+    """
+    def __init__(self,
+                 angle_grids: Grids,
+                 ratio_grids: Grids,
+                 focus_list: List[Point2D],
+                 x_range: Range,
+                 y_range: Range,
+                 plot_points: int = 200):
+        self.angle_grids = angle_grids
+        self.ratio_grids = ratio_grids
+        self.focus_list = focus_list
+        self.xs, self.ys = make_grid(x_range, y_range, plot_points)
+        self.zs = self.xs + 1j * self.ys
+        self.pixel_size = (x_range.sup - x_range.inf) / plot_points
+        f1, f2 = (complex(f.x, f.y) for f in focus_list)
+        self.to_model = np.array([[1, -f2], [1, -f1]], dtype=complex)
+
+    def label(self, transform: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Label map (see `src.raster.PARITY`) of the checkerboard moved by `transform`."""
+        ws = apply(self.to_model @ inverse(transform), self.zs)
+        angles = np.angle(ws)
+        angles %= pi
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios = 1 / (ws.real**2 + ws.imag**2)
+        angle_index = band_index(angles, self.angle_grids)
+        ratio_index = band_index(ratios, self.ratio_grids)
+        labels = np.bitwise_and(angle_index + ratio_index, PARITY, out=out,
+                                dtype=np.uint8, casting="unsafe")
+        labels[edge_mask(angle_index, ratio_index)] |= BOUNDARY
+        for focus in apply(transform, np.array([complex(f.x, f.y) for f in self.focus_list])):
+            if np.isfinite(focus):
+                mark_point(labels, Point2D(focus.real, focus.imag), self.xs, self.ys,
+                           2 * self.pixel_size, MARKER)
+        return labels
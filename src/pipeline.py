@@ -0,0 +1,123 @@
+from collections import deque
+from multiprocessing.pool import Pool
+from typing import Callable, Deque, Iterable, Iterator, Optional, Tuple, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def bounded_imap(pool: Pool,
+                 func: Callable[[T], R],
+                 iterable: Iterable[T],
+                 max_pending: Optional[int] = None) -> Iterator[R]:
+    """Ordered `pool.imap` that keeps at most `max_pending` results in flight.
+
+    `Pool.imap` queues every finished result until the consumer asks for it, so
+    a slow consumer (e.g. an encoder) lets results pile up in memory. Here a new
+    task is only submitted once the oldest one has been handed out.
+    """
+    if max_pending is None:
+        max_pending = 2 * pool._processes  # type: ignore
+    pending: Deque = deque()
+    for arg in iterable:
+        if len(pending) >= max_pending:
+            yield pending.popleft().get()
+        pending.append(pool.apply_async(func, (arg, )))
+    while pending:
+        yield pending.popleft().get()
+
+
+class SharedFrameRing:
+    """A ring of preallocated frame slots in `multiprocessing.shared_memory`.
+
+    Pool workers attach to it once (see `attach_ring`) and render straight into
+    a slot, so only the slot index crosses the process boundary.
+    """
+    def __init__(self, slots: int, shape: Tuple[int, ...], dtype=np.uint8):
+        from multiprocessing.shared_memory import SharedMemory
+
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        size = slots * int(np.prod(self.shape)) * self.dtype.itemsize
+        self._shm = SharedMemory(create=True, size=size)
+        self.frames = np.ndarray((slots, ) + self.shape, dtype=self.dtype,
+                                 buffer=self._shm.buf)
+
+    @property
+    def spec(self) -> Tuple:
+        """`initargs` for `attach_ring` in the pool workers."""
+        return (self._shm.name, self.slots, self.shape, self.dtype.str)
+
+    def __getitem__(self, slot: int) -> np.ndarray:
+        return self.frames[slot]
+
+    def close(self) -> None:
+        del self.frames
+        try:
+            self._shm.close()
+        except BufferError:
+            # A consumer still holds a frame view; the mapping is released
+            # together with it.
+            pass
+        self._shm.unlink()
+
+    def __enter__(self) -> "SharedFrameRing":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+_worker_shm = None
+_worker_frames: Optional[np.ndarray] = None
+
+
+def _open_shared_memory(name: str):
+    from multiprocessing.shared_memory import SharedMemory
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always registers the segment with the resource
+        # tracker, which would unlink it when the first worker exits.
+        from multiprocessing import resource_tracker
+        shm = SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore
+        return shm
+
+
+def attach_ring(name: str, slots: int, shape: Tuple[int, ...], dtype: str) -> None:
+    """Pool initializer mapping the parent's `SharedFrameRing` into this worker."""
+    global _worker_shm, _worker_frames
+    _worker_shm = _open_shared_memory(name)
+    _worker_frames = np.ndarray((slots, ) + tuple(shape), dtype=np.dtype(dtype),
+                                buffer=_worker_shm.buf)
+
+
+def _render_into_slot(func: Callable, arg, slot: int) -> int:
+    func(arg, out=_worker_frames[slot])
+    return slot
+
+
+def shared_imap(pool: Pool, func: Callable[..., np.ndarray], iterable: Iterable,
+                ring: SharedFrameRing) -> Iterator[np.ndarray]:
+    """Ordered map over `func(arg, out=slot)` through the slots of `ring`.
+
+    `pool` must have been created with `initializer=attach_ring,
+    initargs=ring.spec`. The yielded arrays are views into the ring: a slot is
+    handed back to the workers as soon as the consumer asks for the next frame,
+    so copy a frame if it has to outlive the iteration step.
+    """
+    free_slots: Deque[int] = deque(range(ring.slots))
+    pending: Deque = deque()
+    for arg in iterable:
+        if not free_slots:
+            slot = pending.popleft().get()
+            yield ring[slot]
+            free_slots.append(slot)
+        slot = free_slots.popleft()
+        pending.append(pool.apply_async(_render_into_slot, (func, arg, slot)))
+    while pending:
+        yield ring[pending.popleft().get()]
@@ -0,0 +1,177 @@
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.batch import LINE, CircleBatch
+from src.circles import Circle, Inequality, Point2D, Range
+
+Colour = Union[str, Tuple[float, float, float]]
+Region = List[Inequality]
+
+# Bits of a label map: the colour key of the cell, whether the pixel is a
+# point marker, and how much of it a boundary stroke covers, from 0 up to
+# BOUNDARY_LEVELS (all bits of BOUNDARY set) for a fully covered pixel.
+PARITY = 0x01
+MARKER = 0x02
+BOUNDARY_SHIFT = 2
+BOUNDARY = 0xFF & ~(PARITY | MARKER)
+BOUNDARY_LEVELS = BOUNDARY >> BOUNDARY_SHIFT
+
+
+def make_grid(x_range: Range, y_range: Range,
+              plot_points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Pixel-centre coordinates of a `plot_points` x `plot_points` frame.
+
+    `xs` has shape (1, plot_points) and `ys` has shape (plot_points, 1), so they
+    broadcast against each other; row 0 is the top of the frame (y = y_range.sup).
+    """
+    x_step = (x_range.sup - x_range.inf) / plot_points
+    y_step = (y_range.sup - y_range.inf) / plot_points
+    xs = x_range.inf + (np.arange(plot_points) + 0.5) * x_step
+    ys = y_range.sup - (np.arange(plot_points) + 0.5) * y_step
+    return xs[np.newaxis, :], ys[:, np.newaxis]
+
+
+@lru_cache(maxsize=None)
+def _named_rgb(colour: str) -> Tuple[int, int, int]:
+    from matplotlib.colors import to_rgb
+    return tuple(int(round(255 * c)) for c in to_rgb(colour))
+
+
+def to_rgb(colour: Colour) -> Tuple[int, int, int]:
+    if isinstance(colour, str):
+        return _named_rgb(colour)
+    return tuple(int(round(255 * c)) for c in colour)
+
+
+def colorize(labels: np.ndarray,
+             col_dict: Dict,
+             bound_col: Colour = "black",
+             out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Turns a label map into a (..., 3) uint8 RGB image."""
+    return np.take(label_palette(col_dict, bound_col), labels, axis=0, out=out)
+
+
+def label_palette(col_dict: Dict, bound_col: Colour = "black") -> np.ndarray:
+    """(256, 3) uint8 colour of every label value, strokes blended over the cell colour."""
+    labels = np.arange(256)
+    cell = np.array([to_rgb(col_dict[0]), to_rgb(col_dict[1])], dtype=float)[labels & PARITY]
+    coverage = ((labels & BOUNDARY) >> BOUNDARY_SHIFT) / BOUNDARY_LEVELS
+    coverage[(labels & MARKER) != 0] = 1
+    palette = cell + coverage[:, np.newaxis] * (np.array(to_rgb(bound_col)) - cell)
+    return np.round(palette).astype(np.uint8)
+
+
+def rasterize_regions(region_list: Sequence[Tuple[Region, Colour]],
+                      xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    shape = np.broadcast(xs, ys).shape
+    # Every boundary is shared by many regions: evaluate each one once.
+    values: Dict[int, np.ndarray] = {}
+    sides: Dict[Tuple[int, int], np.ndarray] = {}
+    palette: List[Tuple[int, int, int]] = [(255, 255, 255)]
+    index = np.zeros(shape, dtype=np.uint8)
+    mask = np.empty(shape, dtype=bool)
+    for region, incol in region_list:
+        mask.fill(True)
+        for ineq in region:
+            key = (id(ineq.boundary), ineq.sign)
+            if key not in sides:
+                if id(ineq.boundary) not in values:
+                    values[id(ineq.boundary)] = np.broadcast_to(
+                        ineq.boundary.evaluate(xs, ys), shape)
+                sides[key] = ineq.sign * values[id(ineq.boundary)] > 0
+            mask &= sides[key]
+        rgb = to_rgb(incol)
+        if rgb not in palette:
+            palette.append(rgb)
+        np.copyto(index, palette.index(rgb), where=mask)
+    return np.array(palette, dtype=np.uint8)[index]
+
+
+def boundary_mask(boundary: Circle, xs: np.ndarray,
+                  ys: np.ndarray) -> np.ndarray:
+    """Pixels where the sign of `boundary.alg_eq` changes towards a neighbour."""
+    positive = np.broadcast_to(boundary.evaluate(xs, ys) > 0,
+                               np.broadcast(xs, ys).shape)
+    mask = np.zeros(positive.shape, dtype=bool)
+    horizontal = positive[:, 1:] != positive[:, :-1]
+    vertical = positive[1:, :] != positive[:-1, :]
+    mask[:, 1:] |= horizontal
+    mask[1:, :] |= vertical
+    return mask
+
+
+def mark_point(labels: np.ndarray, point: Point2D, xs: np.ndarray, ys: np.ndarray,
+               radius: float, value: int) -> None:
+    """Sets `value` on the pixels of `labels` within `radius` of `point`."""
+    cols = np.flatnonzero(np.abs(xs.ravel() - point.x) <= radius)
+    rows = np.flatnonzero(np.abs(ys.ravel() - point.y) <= radius)
+    if len(cols) == 0 or len(rows) == 0:
+        return
+    window = (slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1))
+    mask = (xs[:, window[1]] - point.x)**2 + (ys[window[0]] - point.y)**2 <= radius**2
+    labels[window][mask] |= value
+
+
+def stroke_coverage(boundaries: CircleBatch,
+                    xs: np.ndarray,
+                    ys: np.ndarray,
+                    pixel_size: float,
+                    width: float = 1.0) -> np.ndarray:
+    """Anti-aliased coverage in [0, 1] of strokes `width` pixels wide along `boundaries`.
+
+    Uses the exact distance to every line, circle and point (a point is drawn
+    as a dot of the stroke width), so there are no gaps where the boundaries
+    crowd together near the foci. Each boundary is only evaluated on the
+    pixels its stroke can reach.
+    """
+    shape = np.broadcast(xs, ys).shape
+    xs, ys = xs.ravel(), ys.ravel()
+    reach = stroke_reach(width)
+    distance = np.full(shape, np.inf)
+    flat = boundaries.reshape(-1)
+    for i in range(len(flat)):
+        rows, cols = slice(None), slice(None)
+        if flat.kind[i] != LINE:
+            extent = flat.radius[i] + reach * pixel_size
+            rows = _index_window(ys, flat.centre_y[i], extent)
+            cols = _index_window(xs, flat.centre_x[i], extent)
+            if rows is None or cols is None:
+                continue
+        d = flat[i].distance(xs[cols][np.newaxis, :], ys[rows][:, np.newaxis])
+        np.minimum(distance[rows, cols], d, out=distance[rows, cols])
+    return distance_coverage(distance, pixel_size, width)
+
+
+def stroke_reach(width: float) -> float:
+    """Distance, in pixels, at which the coverage of a stroke `width` pixels wide drops to 0."""
+    return width / 2 + 0.5
+
+
+def distance_coverage(distance: np.ndarray, pixel_size: float, width: float = 1.0) -> np.ndarray:
+    """Coverage of a pixel by a stroke `width` pixels wide whose centre line is `distance` away."""
+    coverage = stroke_reach(width) - distance / pixel_size
+    return np.clip(coverage, 0, 1, out=coverage)
+
+
+def _index_window(coords: np.ndarray, centre: float, extent: float) -> Optional[slice]:
+    inside = np.flatnonzero(np.abs(coords - centre) <= extent)
+    if len(inside) == 0:
+        return None
+    return slice(inside[0], inside[-1] + 1)
+
+
+def quantize_coverage(coverage: np.ndarray) -> np.ndarray:
+    """Stroke coverage as the BOUNDARY bits of a label map."""
+    levels = np.rint(coverage * BOUNDARY_LEVELS).astype(np.uint8)
+    return levels << BOUNDARY_SHIFT
+
+
+def edge_mask(*index_arrays: np.ndarray) -> np.ndarray:
+    """Pixels whose cell index differs from the right or lower neighbour in any array."""
+    mask = np.zeros(index_arrays[0].shape, dtype=bool)
+    for index in index_arrays:
+        mask[:, 1:] |= index[:, 1:] != index[:, :-1]
+        mask[1:, :] |= index[1:, :] != index[:-1, :]
+    return mask
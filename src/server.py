@@ -0,0 +1,281 @@
+import argparse
+import base64
+import io
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import threading
+from multiprocessing import Pool
+from multiprocessing.pool import AsyncResult
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+from numpy import inf
+
+from src.cache import FrameCache, frame_key
+from src.checkerboard import COL_DICT, get_angle_grids, get_ratio_grids, label_checkerboard
+from src.circles import Point2D, Range
+from src.raster import label_palette
+
+FORMATS = ("png", "labels")
+
+Reply = Dict[str, Any]
+
+
+class RenderJob(NamedTuple):
+    """The parameters of one requested frame; every field may be left out of a request."""
+    init_angle: float = 0.0
+    p: int = 6
+    # Inner bounds of the ratio bands, between 0 and inf; `get_ratio_grids()` by default.
+    ratios: Optional[Tuple[float, ...]] = None
+    foci: Tuple[Tuple[float, float], ...] = ((0.0, 1.0), (0.0, -1.0))
+    x_range: Tuple[float, float] = (-6.0, 6.0)
+    y_range: Tuple[float, float] = (-6.0, 6.0)
+    plot_points: int = 200
+    stroke_width: Optional[float] = None
+    colours: Tuple[str, str] = (COL_DICT[0], COL_DICT[1])
+    bound_colour: str = "black"
+    # "png" for a palette PNG, "labels" for the raw uint8 label map.
+    format: str = "png"
+
+    @classmethod
+    def from_request(cls, request: Dict[str, Any]) -> "RenderJob":
+        if not isinstance(request, dict):
+            raise ValueError("a request must be a JSON object")
+        unknown = set(request) - set(cls._fields) - {"id"}
+        if unknown:
+            raise ValueError(f"unknown fields: {', '.join(sorted(unknown))}")
+        job = cls(**{name: request[name] for name in cls._fields if name in request})
+        job = job._replace(
+            init_angle=float(job.init_angle),
+            p=int(job.p),
+            ratios=None if job.ratios is None else tuple(float(ratio) for ratio in job.ratios),
+            foci=tuple((float(x), float(y)) for x, y in job.foci),
+            x_range=tuple(float(bound) for bound in job.x_range),
+            y_range=tuple(float(bound) for bound in job.y_range),
+            plot_points=int(job.plot_points),
+            stroke_width=None if job.stroke_width is None else float(job.stroke_width),
+            colours=tuple(job.colours),
+        )
+        if job.format not in FORMATS:
+            raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+        if len(job.foci) != 2 or len(job.colours) != 2 or len(job.x_range) != 2 or len(job.y_range) != 2:
+            raise ValueError("foci, colours, x_range and y_range take two entries each")
+        if job.p < 1 or job.plot_points < 1:
+            raise ValueError("p and plot_points must be positive")
+        return job
+
+
+def render_job(job: RenderJob) -> bytes:
+    """The encoded frame of `job`."""
+    focus_list = [Point2D(x, y) for x, y in job.foci]
+    if job.ratios is None:
+        ratio_grids = get_ratio_grids()
+    else:
+        bounds = [0.0, *sorted(job.ratios), inf]
+        ratio_grids = [Range(lower, upper) for lower, upper in zip(bounds, bounds[1:])]
+    labels = label_checkerboard(get_angle_grids(init_angle=job.init_angle, p=job.p), ratio_grids, focus_list,
+                                Range(*job.x_range), Range(*job.y_range), focus_list, job.plot_points,
+                                stroke_width=job.stroke_width)
+    if job.format == "labels":
+        return labels.tobytes()
+    from PIL import Image
+    image = Image.frombytes("P", labels.shape[::-1], labels.tobytes())
+    image.putpalette(label_palette(dict(enumerate(job.colours)), job.bound_colour).tobytes())
+    buffer = io.BytesIO()
+    # Previews favour latency over size.
+    image.save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+def _warm_worker() -> None:
+    # Imports Pillow and fills the per-process kernel caches before the first request.
+    render_job(RenderJob(plot_points=8))
+
+
+class RenderServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Renders frames for clients of a Unix socket, speaking JSON lines.
+
+    Every line a client sends is a request object of `RenderJob` fields plus
+    an optional "id". It is answered by one line with the same "id" and
+    either "error" or the "format", "shape" and base64 "data" of the frame.
+    A connection may send any number of requests without waiting. They are
+    rendered concurrently on one long-lived pool and answered in order.
+
+    Encoded frames are kept in a byte-bounded LRU. Identical requests that
+    arrive while one is rendering share its result.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, path: Union[str, Path], processes: Optional[int] = None, cache_size_mb: int = 256):
+        self.pool = Pool(processes, initializer=_warm_worker)
+        self.cache = FrameCache(max_memory_bytes=cache_size_mb * 2**20)
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, AsyncResult] = {}
+        super().__init__(str(path), _Handler)
+
+    def submit(self, line: bytes) -> Callable[[], Reply]:
+        """Starts rendering the request of `line`; the returned function waits for its reply."""
+        request_id = None
+        try:
+            request = json.loads(line)
+            if isinstance(request, dict):
+                request_id = request.get("id")
+            job = RenderJob.from_request(request)
+        except (ValueError, TypeError) as e:
+            error = {"id": request_id, "error": str(e)}
+            return lambda: error
+
+        key = frame_key(**job._asdict())
+        with self._lock:
+            data = self.cache.get(key)
+            result = self._in_flight.get(key)
+            if data is None and result is None:
+                result = self._in_flight[key] = self.pool.apply_async(
+                    render_job, (job, ),
+                    callback=lambda encoded: self._done(key, encoded),
+                    error_callback=lambda _: self._done(key, None))
+
+        def reply() -> Reply:
+            if data is not None:
+                encoded = data.tobytes()
+            else:
+                try:
+                    encoded = result.get()
+                except Exception as e:
+                    return {"id": request_id, "error": f"{type(e).__name__}: {e}"}
+            return {
+                "id": request_id,
+                "format": job.format,
+                "shape": [job.plot_points, job.plot_points],
+                "data": base64.b64encode(encoded).decode("ascii"),
+            }
+
+        return reply
+
+    def _done(self, key: str, data: Optional[bytes]) -> None:
+        with self._lock:
+            if data is not None:
+                self.cache.put(key, np.frombuffer(data, dtype=np.uint8))
+            del self._in_flight[key]
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.pool.terminate()
+        self.pool.join()
+        try:
+            os.unlink(self.server_address)
+        except FileNotFoundError:
+            pass
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        replies: "queue.Queue[Optional[Callable[[], Reply]]]" = queue.Queue()
+        writer = threading.Thread(target=self._write_replies, args=(replies, ), daemon=True)
+        writer.start()
+        for line in self.rfile:
+            if line.strip():
+                replies.put(self.server.submit(line))
+        replies.put(None)
+        writer.join()
+
+    def _write_replies(self, replies: "queue.Queue[Optional[Callable[[], Reply]]]") -> None:
+        while True:
+            reply = replies.get()
+            if reply is None:
+                return
+            try:
+                self.wfile.write((json.dumps(reply()) + "\n").encode())
+            except OSError:
+                # The client went away; its remaining requests are dropped.
+                return
+
+
+class RenderClient:
+    """Connection to a `RenderServer`, with the frame data of replies decoded to bytes."""
+    def __init__(self, path: Union[str, Path]):
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(str(path))
+        self._file = self._socket.makefile("rwb")
+
+    def send(self, **params: Any) -> None:
+        self._file.write((json.dumps(params) + "\n").encode())
+        self._file.flush()
+
+    def receive(self) -> Reply:
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("the render server closed the connection")
+        reply = json.loads(line)
+        if "data" in reply:
+            reply["data"] = base64.b64decode(reply["data"])
+        return reply
+
+    def render(self, **params: Any) -> Reply:
+        self.send(**params)
+        return self.receive()
+
+    def render_many(self, requests: Iterable[Dict[str, Any]]) -> Iterator[Reply]:
+        """Sends every request before reading any reply, so they are rendered in parallel."""
+        count = 0
+        for request in requests:
+            self.send(**request)
+            count += 1
+        for _ in range(count):
+            yield self.receive()
+
+    def close(self) -> None:
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self) -> "RenderClient":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+def labels_of(reply: Reply) -> np.ndarray:
+    """The label map of a reply to a request for the "labels" format."""
+    return np.frombuffer(reply["data"], dtype=np.uint8).reshape(reply["shape"])
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Serves checkerboard frames over a Unix socket.")
+    parser.add_argument("--socket", default="moebius-render.sock")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--cache_size_mb", type=int, default=256)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    if os.path.exists(args.socket):
+        # Left behind by a server that did not shut down cleanly, unless one is still listening.
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(args.socket)
+        except ConnectionRefusedError:
+            os.unlink(args.socket)
+        else:
+            raise SystemExit(f"a server is already listening on {args.socket}")
+        finally:
+            probe.close()
+    server = RenderServer(args.socket, processes=args.processes, cache_size_mb=args.cache_size_mb)
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import json
+import os
+from functools import partial
+from multiprocessing.pool import Pool
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Tuple, Union
+
+import numpy as np
+
+
+class FrameStore:
+    """A directory holding every frame of an animation as one memory-mapped `.npy` array.
+
+    `frames.npy` is preallocated for all frames and `done.npy` is a bitmap of
+    the frames written so far. A frame's bit is only set once its data has
+    been flushed, so after a crash the store holds exactly the frames whose
+    bit is set, and opening it again with the same `key` resumes from there.
+    Any frame range can be read without loading the others.
+    """
+    def __init__(self, directory: Union[str, Path], frame_count: int, frame_shape: Tuple[int, ...],
+                 key: str, dtype=np.uint8):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "key": key,
+            "frame_count": frame_count,
+            "frame_shape": list(frame_shape),
+            "dtype": np.dtype(dtype).str,
+        }
+        try:
+            with open(self._meta_path) as f:
+                resumable = json.load(f) == meta
+        except (FileNotFoundError, ValueError):
+            resumable = False
+        if resumable:
+            try:
+                self.frames = np.load(self.frames_path, mmap_mode="r+")
+                self.done = np.load(self._done_path, mmap_mode="r+")
+            except (FileNotFoundError, ValueError):
+                resumable = False
+        if not resumable:
+            # Invalidate first, so a crash while recreating is not taken for a valid store.
+            if self._meta_path.exists():
+                self._meta_path.unlink()
+            self.frames = np.lib.format.open_memmap(str(self.frames_path), mode="w+", dtype=dtype,
+                                                    shape=(frame_count, ) + tuple(frame_shape))
+            self.done = np.lib.format.open_memmap(str(self._done_path), mode="w+", dtype=bool,
+                                                  shape=(frame_count, ))
+            self.frames.flush()
+            self.done.flush()
+            _write_atomically(self._meta_path, json.dumps(meta))
+
+    @property
+    def frames_path(self) -> Path:
+        return self.directory / "frames.npy"
+
+    @property
+    def _done_path(self) -> Path:
+        return self.directory / "done.npy"
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.directory / "meta.json"
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def __getitem__(self, index) -> np.ndarray:
+        return self.frames[index]
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        return iter(self.frames)
+
+    def missing(self) -> List[int]:
+        return np.flatnonzero(~self.done).tolist()
+
+    def is_done(self, index: int) -> bool:
+        return bool(self.done[index])
+
+    def mark_done(self, index: int) -> None:
+        """Records frame `index` as complete; its data must already be on disk."""
+        self.done[index] = True
+        self.done.flush()
+
+    def write(self, index: int, frame: np.ndarray) -> None:
+        self.frames[index] = frame
+        self.frames.flush()
+        self.mark_done(index)
+
+    def close(self) -> None:
+        self.frames.flush()
+        self.done.flush()
+        del self.frames, self.done
+
+    def __enter__(self) -> "FrameStore":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+def _write_atomically(path: Path, text: str) -> None:
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _render_into_store(render: Callable[..., Any], path: str, item: Tuple[int, Any]) -> int:
+    index, arg = item
+    frames = np.load(path, mmap_mode="r+")
+    render(arg, out=frames[index])
+    frames.flush()
+    del frames
+    return index
+
+
+def fill_store(pool: Pool, render: Callable[..., Any], items: Iterable[Tuple[int, Any]],
+               store: FrameStore) -> Iterator[int]:
+    """Renders `render(arg, out=...)` for every (frame index, arg) of `items` across `pool`.
+
+    Workers write straight into the store's memory map; each frame is marked
+    done once its worker has flushed it. Yields the indices as they complete.
+    """
+    for index in pool.imap_unordered(partial(_render_into_store, render, str(store.frames_path)), items):
+        store.mark_done(index)
+        yield index
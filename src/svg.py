@@ -0,0 +1,238 @@
+import math
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from numpy import inf, pi
+
+from src.batch import CIRCLE, LINE, frame_boundaries
+from src.circles import Num, Point2D, Range
+from src.raster import Colour, to_rgb
+
+Grids = Sequence[Tuple[Num, Num]]
+PathLike = Union[str, Path]
+
+# Angles and radii this close to the point w = 1, which is at infinity in the
+# plane, are snapped onto it.
+_SNAP = 1e-9
+
+# Cells are the sectors theta0 <= arg(w) <= theta1, r0 <= |w| <= r1 of the
+# model plane w = (z - f2) / (z - f1), in which the bipolar angle is arg(w)
+# mod pi and the ratio 1 / |w|^2. The inverse z = (f1 w - f2) / (w - 1) is a
+# Moebius transform, so every edge of a cell is an arc of a circle or a line
+# in the plane as well, and is drawn from the images of its end and middle
+# points.
+
+
+def _snap(value: float, target: float) -> float:
+    return target if abs(value - target) < _SNAP else value
+
+
+def cell_sectors(angle_grids: Grids, ratio_grids: Grids) -> Iterator[Tuple[int, float, float, float, float]]:
+    """(parity, theta0, theta1, r0, r1) of every cell as sectors of the model plane.
+
+    An angle band covers two opposite sectors. Sectors reaching w = 1 are
+    split there, so infinity is at most a corner of a sector.
+    """
+    for i, (lower, upper) in enumerate(angle_grids):
+        if upper <= lower:
+            upper += pi
+        for j, (ratio0, ratio1) in enumerate(ratio_grids):
+            r0 = 0.0 if ratio1 == inf else _snap(1 / math.sqrt(ratio1), 1.0)
+            r1 = inf if ratio0 == 0 else _snap(1 / math.sqrt(ratio0), 1.0)
+            for k in (0, 1):
+                theta0 = _snap(_snap(lower + k * pi, 0.0), 2 * pi)
+                theta1 = _snap(upper + k * pi, 2 * pi)
+                thetas = [theta0, theta1]
+                if theta0 < 2 * pi < theta1:
+                    thetas.insert(1, 2 * pi)
+                for t0, t1 in zip(thetas, thetas[1:]):
+                    radii = [r0, r1]
+                    if (t0 in (0.0, 2 * pi) or t1 == 2 * pi) and r0 < 1 < r1:
+                        radii.insert(1, 1.0)
+                    for s0, s1 in zip(radii, radii[1:]):
+                        yield (i + j) & 1, t0, t1, s0, s1
+
+
+class _Plane:
+    """Maps points of the model plane to SVG user units (x, -y); None is infinity."""
+    def __init__(self, focus_list: List[Point2D]):
+        self.f1, self.f2 = (complex(focus.x, focus.y) for focus in focus_list)
+
+    def __call__(self, r: float, theta: float) -> Optional[complex]:
+        if r == inf:
+            z = self.f1
+        elif r == 1.0 and theta in (0.0, 2 * pi):
+            return None
+        else:
+            w = r * complex(math.cos(theta), math.sin(theta))
+            z = (self.f1 * w - self.f2) / (w - 1)
+        return z.conjugate()
+
+
+def _middle(r0: float, r1: float) -> float:
+    if r0 == 0 and r1 == inf:
+        return 1.0
+    if r0 == 0:
+        return r1 / 2
+    if r1 == inf:
+        return 2 * r0
+    return math.sqrt(r0 * r1)
+
+
+def _fmt(z: complex) -> str:
+    return f"{z.real:.7g},{z.imag:.7g}"
+
+
+def _arc(start: complex, middle: complex, end: complex) -> str:
+    """SVG path command from `start` through `middle` to `end` along their circle."""
+    a, b = middle - start, end - start
+    turn = a.real * b.imag - a.imag * b.real
+    if abs(turn) <= 1e-12 * max(abs(a), abs(b))**2:
+        return f"L{_fmt(end)}"
+    # Circumcentre relative to `start`.
+    centre = 1j * (a * abs(b)**2 - b * abs(a)**2) / (2 * turn)
+    radius = abs(centre)
+    chord_side = b.real * a.imag - b.imag * a.real
+    centre_side = b.real * centre.imag - b.imag * centre.real
+    large = int(chord_side * centre_side > 0)
+    sweep = int(turn > 0)
+    return f"A{radius:.7g},{radius:.7g} 0 {large} {sweep} {_fmt(end)}"
+
+
+def cell_path(sector: Tuple[float, float, float, float], plane: _Plane, reach: float) -> str:
+    """Closed SVG path of one sector; a corner at infinity is cut off `reach` out."""
+    theta0, theta1, r0, r1 = sector
+    theta = (theta0 + theta1) / 2
+    r = _middle(r0, r1)
+    edges = []
+    if r0 > 0:
+        edges.append((plane(r0, theta0), plane(r0, theta), plane(r0, theta1)))
+    edges.append((plane(r0, theta1), plane(r, theta1), plane(r1, theta1)))
+    if r1 < inf:
+        edges.append((plane(r1, theta1), plane(r1, theta), plane(r1, theta0)))
+    edges.append((plane(r1, theta0), plane(r, theta0), plane(r0, theta0)))
+    first = next(i for i, edge in enumerate(edges) if edge[0] is not None)
+    edges = edges[first:] + edges[:first]
+
+    commands = [f"M{_fmt(edges[0][0])}"]
+    for start, middle, end in edges:
+        if end is None:
+            # Edges through infinity are lines, leaving along start -> middle.
+            direction = (middle - start) / abs(middle - start)
+            commands.append(f"L{_fmt(start + reach * direction)}")
+        elif start is None:
+            direction = (middle - end) / abs(middle - end)
+            commands.append(f"L{_fmt(end + reach * direction)}L{_fmt(end)}")
+        else:
+            commands.append(_arc(start, middle, end))
+    commands.append("Z")
+    return "".join(commands)
+
+
+def _hex(colour: Colour) -> str:
+    return "#{:02x}{:02x}{:02x}".format(*to_rgb(colour))
+
+
+def frame_elements(angle_grids: Grids,
+                   ratio_grids: Grids,
+                   focus_list: List[Point2D],
+                   x_range: Range,
+                   y_range: Range,
+                   col_dict: Dict,
+                   bound_col: Colour = "black",
+                   pixel_size: float = 0.06,
+                   stroke_width: float = 1.0) -> List[str]:
+    """SVG elements of one checkerboard frame: the cells of each colour as one path, then the
+    boundaries and foci, with strokes `stroke_width` pixels of `pixel_size` wide."""
+    plane = _Plane(focus_list)
+    extent = sum(abs(bound) for bound in (*x_range, *y_range)) + sum(abs(f) for f in (plane.f1, plane.f2))
+    reach = 100 * extent
+    cells: Dict[int, List[str]] = {0: [], 1: []}
+    for parity, *sector in cell_sectors(angle_grids, ratio_grids):
+        cells[parity].append(cell_path(sector, plane, reach))
+
+    elements = []
+    for parity in (0, 1):
+        elements.append(f'<path fill="{_hex(col_dict[parity])}" d="{"".join(cells[parity])}"/>')
+    bound = _hex(bound_col)
+    elements.append(f'<g fill="none" stroke="{bound}" stroke-width="{stroke_width * pixel_size:.7g}">')
+    boundaries = frame_boundaries(angle_grids, ratio_grids, focus_list)
+    for i, kind in enumerate(boundaries.kind):
+        centre = complex(boundaries.centre_x[i], -boundaries.centre_y[i])
+        if kind == CIRCLE:
+            elements.append(f'<circle cx="{centre.real:.7g}" cy="{centre.imag:.7g}" '
+                            f'r="{boundaries.radius[i]:.7g}"/>')
+        elif kind == LINE:
+            normal = complex(boundaries.normal_x[i], -boundaries.normal_y[i])
+            foot = normal * boundaries.offset[i]
+            along = normal * 1j * 2 * extent
+            elements.append(f'<path d="M{_fmt(foot - along)}L{_fmt(foot + along)}"/>')
+    elements.append("</g>")
+    markers = "".join(f'<circle cx="{focus.x:.7g}" cy="{-focus.y:.7g}" r="{2 * pixel_size:.7g}"/>'
+                      for focus in focus_list)
+    elements.append(f'<g fill="{bound}">{markers}</g>')
+    return elements
+
+
+def _document(x_range: Range, y_range: Range, size: int, body: List[str]) -> str:
+    width, height = x_range.sup - x_range.inf, y_range.sup - y_range.inf
+    return "\n".join([
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size * height / width:.7g}" '
+        f'viewBox="{x_range.inf:.7g} {-y_range.sup:.7g} {width:.7g} {height:.7g}">',
+        *body,
+        "</svg>\n",
+    ])
+
+
+def write_svg(path: PathLike,
+              angle_grids: Grids,
+              ratio_grids: Grids,
+              focus_list: List[Point2D],
+              x_range: Range,
+              y_range: Range,
+              col_dict: Dict,
+              bound_col: Colour = "black",
+              size: int = 200,
+              stroke_width: float = 1.0) -> None:
+    """Writes one frame as an SVG `size` pixels wide, clipped to the window."""
+    pixel_size = (x_range.sup - x_range.inf) / size
+    elements = frame_elements(angle_grids, ratio_grids, focus_list, x_range, y_range, col_dict, bound_col,
+                              pixel_size, stroke_width)
+    Path(path).write_text(_document(x_range, y_range, size, elements))
+
+
+def write_animated_svg(path: PathLike,
+                       angle_grids_list: Sequence[Grids],
+                       ratio_grids: Grids,
+                       focus_list: List[Point2D],
+                       x_range: Range,
+                       y_range: Range,
+                       col_dict: Dict,
+                       fps: float,
+                       bound_col: Colour = "black",
+                       size: int = 200,
+                       stroke_width: float = 1.0) -> None:
+    """Writes the frames of `angle_grids_list` as one looping SVG animation.
+
+    Every frame is a group shown only during its time slot by a discrete SMIL
+    animation of its visibility.
+    """
+    pixel_size = (x_range.sup - x_range.inf) / size
+    n = len(angle_grids_list)
+    body = []
+    for i, angle_grids in enumerate(angle_grids_list):
+        values, key_times = ["visible"], [i / n]
+        if i > 0:
+            values.insert(0, "hidden")
+            key_times.insert(0, 0)
+        if i < n - 1:
+            values.append("hidden")
+            key_times.append((i + 1) / n)
+        animation = (f'<animate attributeName="visibility" values="{";".join(values)}" '
+                     f'keyTimes="{";".join(f"{t:.7g}" for t in key_times)}" dur="{n / fps:.7g}s" '
+                     f'calcMode="discrete" repeatCount="indefinite"/>')
+        body.append('<g visibility="hidden">' + animation)
+        body.extend(frame_elements(angle_grids, ratio_grids, focus_list, x_range, y_range, col_dict, bound_col,
+                                   pixel_size, stroke_width))
+        body.append("</g>")
+    Path(path).write_text(_document(x_range, y_range, size, body))
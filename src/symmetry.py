@@ -0,0 +1,207 @@
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy import inf, pi
+
+from src.bipolar import label_cells
+from src.circles import Num, Point2D
+from src.raster import PARITY
+
+Grids = Sequence[Tuple[Num, Num]]
+Mirror = Tuple[Optional[np.ndarray], Optional[np.ndarray]]
+
+
+class FramePlan(NamedTuple):
+    """Frame `source` of the same animation, with the cell colours swapped if `flip`."""
+    source: int
+    flip: bool
+
+
+def _angle_key(angle: Num, tol: float) -> int:
+    # 0 and pi are the same angle modulo pi.
+    return int(round((angle % pi) / tol)) % int(round(pi / tol))
+
+
+def plan_frames(angle_grids_list: Sequence[Grids], tol: float = 1e-9) -> List[FramePlan]:
+    """Finds frames whose angle bands coincide with an earlier frame's.
+
+    Shifting `init_angle` by pi/p moves every band onto its neighbour, so (for
+    even p) the frame repeats with the colours swapped; shifting it by pi
+    repeats it outright. A frame is reused when its band bounds match an
+    earlier frame's and every band moves by the same parity, which makes the
+    difference a pure palette swap.
+    """
+    seen: Dict[Tuple[int, ...], Tuple[int, Dict[int, int]]] = {}
+    plans = []
+    for i, angle_grids in enumerate(angle_grids_list):
+        lower_keys = [_angle_key(lower, tol) for lower, _ in angle_grids]
+        signature = tuple(sorted(lower_keys))
+        if signature not in seen:
+            seen[signature] = (i, {key: band for band, key in enumerate(lower_keys)})
+            plans.append(FramePlan(i, False))
+            continue
+        source, source_bands = seen[signature]
+        parities = {(band + source_bands[key]) % 2 for band, key in enumerate(lower_keys)}
+        if len(parities) == 1:
+            plans.append(FramePlan(source, parities.pop() == 1))
+        else:
+            plans.append(FramePlan(i, False))
+    return plans
+
+
+def limit_retention(plans: Sequence[FramePlan],
+                    frame_bytes: int,
+                    max_bytes: int = 512 * 2**20) -> List[FramePlan]:
+    """Renders reused frames again where holding their source would exceed `max_bytes`.
+
+    A source frame has to be kept from the moment it is rendered until its last
+    reuse, which for the standard sweep is half the animation later.
+    """
+    last_use: Dict[int, int] = {}
+    for i, plan in enumerate(plans):
+        if plan.source != i:
+            last_use[plan.source] = i
+    plans = list(plans)
+    retained: Dict[int, int] = {}
+    for i, plan in enumerate(plans):
+        retained = {source: last for source, last in retained.items() if last >= i}
+        if plan.source != i or i not in last_use:
+            continue
+        if (len(retained) + 1) * frame_bytes <= max_bytes:
+            retained[i] = last_use[i]
+            continue
+        for j in range(i + 1, last_use[i] + 1):
+            if plans[j].source == i:
+                plans[j] = FramePlan(j, False)
+    return plans
+
+
+def replay_frames(plans: Sequence[FramePlan],
+                  rendered: Iterator[np.ndarray]) -> Iterator[np.ndarray]:
+    """Yields every frame of the animation from the frames rendered for `plans`.
+
+    `rendered` yields, in order, the label maps of the frames that are their
+    own source. Sources are kept only until their last reuse.
+    """
+    last_use: Dict[int, int] = {}
+    for i, plan in enumerate(plans):
+        if plan.source != i:
+            last_use[plan.source] = i
+    retained: Dict[int, np.ndarray] = {}
+    for i, plan in enumerate(plans):
+        if plan.source == i:
+            frame = next(rendered)
+            if i in last_use:
+                retained[i] = frame.copy()
+        else:
+            frame = retained[plan.source]
+            if last_use[plan.source] == i:
+                del retained[plan.source]
+            if plan.flip:
+                frame = frame ^ PARITY
+        yield frame
+
+
+def _reflect_ratio(ratio: Num) -> Num:
+    if ratio == 0:
+        return inf
+    elif ratio == inf:
+        return 0.0
+    return 1 / ratio
+
+
+def _reflect_angle(angle: Num) -> Num:
+    return (pi - angle) % pi
+
+
+def _close(a: Num, b: Num, tol: float) -> bool:
+    if a == inf or b == inf:
+        return a == b
+    return abs(a - b) <= tol * max(1.0, abs(a), abs(b))
+
+
+def band_permutation(grids: Grids, reflect: Callable[[Num], Num],
+                     periodic: bool = False, tol: float = 1e-9) -> Optional[np.ndarray]:
+    """Maps each band to the band it is reflected onto, or None if the grid is not symmetric.
+
+    A reflection reverses orientation, so band (lower, upper) lands on
+    (reflect(upper), reflect(lower)).
+    """
+    def same(a: Num, b: Num) -> bool:
+        if periodic:
+            a, b = a % pi, b % pi
+            return _close(a, b, tol) or _close(abs(a - b), pi, tol)
+        return _close(a, b, tol)
+
+    permutation = []
+    for lower, upper in grids:
+        target = (reflect(upper), reflect(lower))
+        for j, (other_lower, other_upper) in enumerate(grids):
+            if same(other_lower, target[0]) and same(other_upper, target[1]):
+                permutation.append(j)
+                break
+        else:
+            return None
+    return np.array(permutation)
+
+
+def _mirrored_axis(centre: Num, coords: np.ndarray, tol: float = 1e-9) -> bool:
+    """Whether the pixel centres `coords` are symmetric about `centre`."""
+    coords = coords.ravel()
+    return bool(np.allclose(coords + coords[::-1], 2 * centre, rtol=0, atol=tol))
+
+
+def mirrored_label_cells(xs: np.ndarray, ys: np.ndarray, angle_grids: Grids,
+                         ratio_grids: Grids, focus_list: List[Point2D],
+                         dtype=np.float64) -> Tuple[np.ndarray, np.ndarray]:
+    """`label_cells` computed on only the part of the frame the mirror symmetries don't reach.
+
+    The reflection in the perpendicular bisector of the foci swaps them, which
+    keeps the bipolar angle and inverts the ratio; the reflection in the focal
+    axis keeps the ratio and sends the angle a to pi - a. Each one that is
+    axis-aligned, centred in the pixel grid and maps the band grid onto itself
+    halves the pixels that are evaluated; the rest is filled in by reflecting
+    the band indices.
+    """
+    focus1, focus2 = focus_list
+    ratio_mirror = band_permutation(ratio_grids, _reflect_ratio)
+    angle_mirror = band_permutation(angle_grids, _reflect_angle, periodic=True)
+    # (angle permutation, ratio permutation) of the mirrors flipping rows and
+    # columns; None as a permutation means the index is kept.
+    row_mirror: Optional[Mirror] = None
+    col_mirror: Optional[Mirror] = None
+    if focus1.x == focus2.x:
+        if ratio_mirror is not None and _mirrored_axis((focus1.y + focus2.y) / 2, ys):
+            row_mirror = (None, ratio_mirror)
+        if angle_mirror is not None and _mirrored_axis(focus1.x, xs):
+            col_mirror = (angle_mirror, None)
+    elif focus1.y == focus2.y:
+        if ratio_mirror is not None and _mirrored_axis((focus1.x + focus2.x) / 2, xs):
+            col_mirror = (None, ratio_mirror)
+        if angle_mirror is not None and _mirrored_axis(focus1.y, ys):
+            row_mirror = (angle_mirror, None)
+
+    height, width = ys.shape[0], xs.shape[1]
+    rows = (height + 1) // 2 if row_mirror is not None else height
+    cols = (width + 1) // 2 if col_mirror is not None else width
+    angle_index, ratio_index = label_cells(xs[:, :cols], ys[:rows], angle_grids,
+                                           ratio_grids, focus_list, dtype)
+    if col_mirror is not None:
+        angle_perm, ratio_perm = col_mirror
+        angle_index = np.hstack(
+            [angle_index, _permute(angle_index[:, :width - cols][:, ::-1], angle_perm)])
+        ratio_index = np.hstack(
+            [ratio_index, _permute(ratio_index[:, :width - cols][:, ::-1], ratio_perm)])
+    if row_mirror is not None:
+        angle_perm, ratio_perm = row_mirror
+        angle_index = np.vstack(
+            [angle_index, _permute(angle_index[:height - rows][::-1], angle_perm)])
+        ratio_index = np.vstack(
+            [ratio_index, _permute(ratio_index[:height - rows][::-1], ratio_perm)])
+    return angle_index, ratio_index
+
+
+def _permute(index: np.ndarray, permutation: Optional[np.ndarray]) -> np.ndarray:
+    if permutation is None:
+        return index
+    return permutation[index]
@@ -0,0 +1,58 @@
+from functools import partial
+from multiprocessing.pool import Pool
+from pathlib import Path
+from typing import Callable, Iterator, List, NamedTuple, Tuple, Union
+
+import numpy as np
+
+
+class Tile(NamedTuple):
+    """Pixel rows [row0, row1) and columns [col0, col1) of a frame."""
+    row0: int
+    row1: int
+    col0: int
+    col1: int
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (self.row1 - self.row0, self.col1 - self.col0)
+
+    @property
+    def index(self) -> Tuple[slice, slice]:
+        return (slice(self.row0, self.row1), slice(self.col0, self.col1))
+
+
+def split_tiles(height: int, width: int, tile_size: int) -> List[Tile]:
+    """Row-major tiles of at most `tile_size` x `tile_size` pixels covering the frame."""
+    return [
+        Tile(row, min(row + tile_size, height), col, min(col + tile_size, width))
+        for row in range(0, height, tile_size) for col in range(0, width, tile_size)
+    ]
+
+
+def _write_tile(render: Callable[[Tile], np.ndarray], path: str, tile: Tile) -> Tile:
+    image = np.load(path, mmap_mode="r+")
+    image[tile.index] = render(tile)
+    image.flush()
+    del image
+    return tile
+
+
+def render_tiled(pool: Pool,
+                 render: Callable[[Tile], np.ndarray],
+                 shape: Tuple[int, ...],
+                 path: Union[str, Path],
+                 tile_size: int = 1024,
+                 dtype=np.uint8) -> Iterator[Tile]:
+    """Renders a frame of `shape` tile by tile across `pool` into a `.npy` file at `path`.
+
+    The file is created as a memory map and every worker writes the tiles it
+    renders straight into it, so neither the workers nor this process ever
+    hold more than a tile. `render` must be picklable and return the
+    `tile.shape + shape[2:]` block of the frame. Yields the tiles as they are
+    done, in no particular order.
+    """
+    image = np.lib.format.open_memmap(str(path), mode="w+", dtype=dtype, shape=tuple(shape))
+    del image
+    tiles = split_tiles(shape[0], shape[1], tile_size)
+    yield from pool.imap_unordered(partial(_write_tile, render, str(path)), tiles)
@@ -1,10 +1,16 @@
+import numpy as np
 from numpy import inf, pi, tan
 
 from src.circles import Num
 
 
 def cot(tangent_angle: Num) -> Num:
-    """It is assumed that foci are at (0,1) and (0,-1). TO-DO: generalize to arbitrary foci"""
+    """It is assumed that foci are at (0,1) and (0,-1). TO-DO: generalize to arbitrary foci
+
+    Also accepts an array of angles and returns the array of cotangents.
+    """
+    if np.ndim(tangent_angle) > 0:
+        return _cot_array(np.asarray(tangent_angle, dtype=float))
     if tangent_angle < 0 or pi < tangent_angle:
         raise Exception(
             f"tangent angle a at focus must be between 0 <= a <= pi. Given value: {tangent_angle}"
@@ -17,10 +23,34 @@ def cot(tangent_angle: Num) -> Num:
         return 1 / tan(tangent_angle)
 
 
+def _cot_array(tangent_angles: np.ndarray) -> np.ndarray:
+    if np.any((tangent_angles < 0) | (pi < tangent_angles)):
+        raise Exception(
+            f"tangent angle a at focus must be between 0 <= a <= pi. Given values: {tangent_angles}"
+        )
+    with np.errstate(divide="ignore"):
+        res = 1 / tan(tangent_angles)
+    res[tangent_angles == 0] = +inf
+    res[tangent_angles == pi] = -inf
+    return res
+
+
 def mod_(x: Num, p: Num) -> Num:
+    """x reduced into [0, p]; unlike %, positive multiples of p map to p.
+
+    Also accepts an array for x.
+    """
+    if np.ndim(x) > 0:
+        return _mod_array(np.asarray(x, dtype=float), p)
     if 0 <= x and x <= p:
         return x
     elif x < 0:
         return mod_(x + p, p)
     else:
         return mod_(x - p, p)
+
+
+def _mod_array(x: np.ndarray, p: Num) -> np.ndarray:
+    res = np.mod(x, p)
+    res[(res == 0) & (x > 0)] = p
+    return res
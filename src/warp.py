@@ -0,0 +1,152 @@
+from collections import OrderedDict
+from typing import NamedTuple, Tuple
+
+import numpy as np
+
+from src.circles import Range
+from src.moebius import apply, inverse
+from src.raster import make_grid
+
+# Fractional bits of int16 fixed-point coordinates, which leaves the integer
+# part for sources of up to 2047 pixels.
+FIXED_POINT_BITS = 4
+
+
+class RemapTable(NamedTuple):
+    """Where every output pixel samples the source image, in source pixels.
+
+    `cols` and `rows` are float32, or int16 fixed point with
+    `FIXED_POINT_BITS` fractional bits at half the memory; pixels whose
+    source lies outside the image (and wraps around is off) are negative.
+    """
+    cols: np.ndarray
+    rows: np.ndarray
+    source_shape: Tuple[int, int]
+    wrap: bool
+
+
+def remap_table(transform: np.ndarray,
+                x_range: Range,
+                y_range: Range,
+                plot_points: int,
+                source_shape: Tuple[int, int],
+                wrap: bool = False,
+                dtype=np.float32) -> RemapTable:
+    """Table pulling the `plot_points` x `plot_points` frame back through `transform`.
+
+    The source image covers the window `x_range` x `y_range` before the
+    transform; with `wrap` it repeats beyond it in every direction.
+    """
+    height, width = source_shape
+    if np.issubdtype(dtype, np.integer) and max(source_shape) >= 2**(15 - FIXED_POINT_BITS):
+        raise ValueError(f"sources of {source_shape} pixels do not fit into fixed-point {np.dtype(dtype)}")
+    xs, ys = make_grid(x_range, y_range, plot_points)
+    sources = apply(inverse(transform), xs + 1j * ys)
+    with np.errstate(invalid="ignore"):
+        cols = (sources.real - x_range.inf) / (x_range.sup - x_range.inf) * width - 0.5
+        rows = (y_range.sup - sources.imag) / (y_range.sup - y_range.inf) * height - 0.5
+    outside = ~(np.isfinite(cols) & np.isfinite(rows))
+    cols[outside] = rows[outside] = 0
+    if wrap:
+        cols %= width
+        rows %= height
+    else:
+        # The outer half pixel takes the colour of the edge.
+        outside |= (cols < -0.5) | (cols > width - 0.5) | (rows < -0.5) | (rows > height - 0.5)
+        np.clip(cols, 0, width - 1, out=cols)
+        np.clip(rows, 0, height - 1, out=rows)
+    cols[outside] = rows[outside] = -1
+    if np.issubdtype(dtype, np.integer):
+        scale = 2**FIXED_POINT_BITS
+        # Rounding down keeps the coordinates inside the image.
+        cols, rows = np.floor(cols * scale), np.floor(rows * scale)
+    return RemapTable(cols.astype(dtype), rows.astype(dtype), (height, width), wrap)
+
+
+def _split(coords: np.ndarray, size: int, wrap: bool) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Integer coordinates of the two neighbours and the weight of the second."""
+    if np.issubdtype(coords.dtype, np.integer):
+        lower = (coords >> FIXED_POINT_BITS).astype(np.intp)
+        weight = (coords & (2**FIXED_POINT_BITS - 1)).astype(np.float32) / 2**FIXED_POINT_BITS
+    else:
+        lower = np.floor(coords).astype(np.intp)
+        weight = coords.astype(np.float32) - lower
+    # Also catches coordinates rounded up onto `size` and the negative ones
+    # outside the source, which are filled afterwards.
+    if wrap:
+        lower %= size
+    else:
+        np.clip(lower, 0, size - 1, out=lower)
+    upper = lower + 1
+    upper[upper == size] = 0 if wrap else size - 1
+    return lower, upper, weight
+
+
+def warp(image: np.ndarray, table: RemapTable, fill=0) -> np.ndarray:
+    """Bilinear samples of `image` at the pixels of `table`; `fill` outside the source.
+
+    `image` is (H, W, ...) with `table.source_shape` as (H, W); several
+    images stacked along a trailing axis are warped in one pass.
+    """
+    image = np.asarray(image)
+    height, width = table.source_shape
+    if image.shape[:2] != (height, width):
+        raise ValueError(f"image of shape {image.shape} does not match the table's {table.source_shape}")
+    flat = image.reshape((height * width, ) + image.shape[2:])
+    col0, col1, col_weight = _split(table.cols, width, table.wrap)
+    row0, row1, row_weight = _split(table.rows, height, table.wrap)
+    trailing = (np.newaxis, ) * (image.ndim - 2)
+    col_weight, row_weight = col_weight[(..., ) + trailing], row_weight[(..., ) + trailing]
+
+    row0 *= width
+    row1 *= width
+    top = flat[row0 + col0] * (1 - col_weight)
+    top += flat[row0 + col1] * col_weight
+    bottom = flat[row1 + col0] * (1 - col_weight)
+    bottom += flat[row1 + col1] * col_weight
+    top *= 1 - row_weight
+    bottom *= row_weight
+    top += bottom
+    if np.issubdtype(image.dtype, np.integer):
+        np.round(top, out=top)
+    res = top.astype(image.dtype)
+    res[table.cols < 0] = fill
+    return res
+
+
+class TextureWarper:
+    """Warps images through Möbius transforms, keeping the tables of the last `cache_size` ones.
+
+    A table depends only on the transform and the source shape, so it is
+    computed once per frame however many images or runs go through it.
+    """
+    def __init__(self,
+                 x_range: Range,
+                 y_range: Range,
+                 plot_points: int,
+                 source_shape: Tuple[int, int],
+                 wrap: bool = False,
+                 dtype=np.float32,
+                 cache_size: int = 64):
+        self.x_range = x_range
+        self.y_range = y_range
+        self.plot_points = plot_points
+        self.source_shape = tuple(source_shape)
+        self.wrap = wrap
+        self.dtype = dtype
+        self.cache_size = cache_size
+        self._tables: "OrderedDict[bytes, RemapTable]" = OrderedDict()
+
+    def table(self, transform: np.ndarray) -> RemapTable:
+        key = np.asarray(transform, dtype=complex).tobytes()
+        if key in self._tables:
+            self._tables.move_to_end(key)
+            return self._tables[key]
+        table = self._tables[key] = remap_table(transform, self.x_range, self.y_range, self.plot_points,
+                                                self.source_shape, self.wrap, self.dtype)
+        if len(self._tables) > self.cache_size:
+            self._tables.popitem(last=False)
+        return table
+
+    def warp(self, image: np.ndarray, transform: np.ndarray, fill=0) -> np.ndarray:
+        return warp(image, self.table(transform), fill)
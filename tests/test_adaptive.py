@@ -0,0 +1,45 @@
+from unittest import TestCase, main
+
+import numpy as np
+
+from src.adaptive import adaptive_frame, tiles_crossed
+from src.batch import CircleBatch
+from src.bipolar import label_cells
+from src.checkerboard import get_angle_grids, get_ratio_grids
+from src.circles import CanonicalCircle, Line, Point2D, Range
+
+FOCUS_LIST = [Point2D(0, 1), Point2D(0, -1)]
+WINDOW = Range(-6, 6)
+
+
+class TilesCrossedTestCases(TestCase):
+    def test_circle_line_and_point(self):
+        x0, x1 = np.array([0.0, 2.0, -0.5]), np.array([1.0, 3.0, 0.5])
+        y0, y1 = np.array([0.0, 0.0, -0.5]), np.array([1.0, 1.0, 0.5])
+        circle = CircleBatch.from_circles([CanonicalCircle(Point2D(0, 0), 1.2)])
+        np.testing.assert_array_equal(tiles_crossed(circle, x0, x1, y0, y1), [True, False, False])
+        line = CircleBatch.from_circles([Line(Point2D(1, 0), 2.5)])
+        np.testing.assert_array_equal(tiles_crossed(line, x0, x1, y0, y1), [False, True, False])
+        point = CircleBatch.from_circles([CanonicalCircle(Point2D(0.1, 0.2), 0)])
+        np.testing.assert_array_equal(tiles_crossed(point, x0, x1, y0, y1), [True, False, True])
+
+
+class AdaptiveFrameTestCases(TestCase):
+    def test_matches_uniform_supersampling(self):
+        plot_points, supersample = 50, 3
+        angle_grids, ratio_grids = get_angle_grids(0.3), get_ratio_grids()
+        frame = adaptive_frame(angle_grids, ratio_grids, FOCUS_LIST, WINDOW, WINDOW, plot_points,
+                               stroke_width=None, supersample=supersample, tile_size=8)
+
+        xs, ys = (WINDOW.inf + (np.arange(plot_points * supersample) + 0.5) *
+                  (WINDOW.sup - WINDOW.inf) / (plot_points * supersample) for _ in range(2))
+        angle_index, ratio_index = label_cells(xs[np.newaxis, :], ys[::-1, np.newaxis],
+                                               angle_grids, ratio_grids, FOCUS_LIST)
+        expected = ((angle_index + ratio_index) % 2).reshape(plot_points, supersample, plot_points,
+                                                             supersample).mean(axis=(1, 3))
+        np.testing.assert_allclose(frame.parity, expected, atol=1e-6)
+        self.assertLess(frame.samples, (plot_points * supersample)**2 / 2)
+
+
+if __name__ == '__main__':
+    main()
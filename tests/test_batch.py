@@ -0,0 +1,63 @@
+from unittest import TestCase, main
+
+import numpy as np
+from numpy import pi
+
+from src.batch import (LINE, POINT, CircleBatch, angle_grids_batch, horizontal_bounded_regions_batch,
+                       vertical_bounded_regions_batch)
+from src.checkerboard import (get_angle_grids, get_horizontal_bounded_regions, get_ratio_grids,
+                              get_vertical_bounded_regions)
+from src.circles import Point2D, Range
+from src.raster import make_grid
+
+XS, YS = make_grid(Range(-6, 6), Range(-6, 6), 37)
+
+
+class AngleGridsTestCases(TestCase):
+    def test_matches_get_angle_grids(self):
+        init_angles = np.array([0, 0.1, pi / 6, 1.0])
+        res = angle_grids_batch(init_angles, p=6)
+        self.assertEqual(res.shape, (4, 6, 2))
+        for grids, init_angle in zip(res, init_angles):
+            np.testing.assert_allclose(grids, get_angle_grids(init_angle=init_angle, p=6), atol=1e-15)
+
+
+class BoundedRegionsTestCases(TestCase):
+    def assertSameSigns(self, batch, circles):
+        values = batch.evaluate(XS, YS)
+        for value, circle in zip(values, circles):
+            expected = circle.evaluate(XS, YS)
+            # Pixels on the boundary itself may go either way.
+            away = np.abs(expected) > 1e-9
+            np.testing.assert_array_equal(np.sign(value)[away], np.sign(expected)[away])
+
+    def test_vertical(self):
+        init_angles = np.array([0, 0.3, pi / 6 - 0.2])
+        lower, upper = vertical_bounded_regions_batch(angle_grids_batch(init_angles))
+        self.assertEqual(lower.shape, (3, 6))
+        self.assertEqual(lower.kind[0, 0], LINE)
+        for i, init_angle in enumerate(init_angles):
+            _, regions = get_vertical_bounded_regions(get_angle_grids(init_angle=init_angle))
+            self.assertSameSigns(lower[i], [region.lower_bound for region in regions])
+            self.assertSameSigns(upper[i], [region.upper_bound for region in regions])
+
+    def test_horizontal(self):
+        focus_list = [Point2D(0.5, 1), Point2D(-0.5, -1)]
+        ratio_grids = get_ratio_grids()
+        lower, upper = horizontal_bounded_regions_batch(ratio_grids, focus_list)
+        self.assertEqual(lower.kind[0], POINT)
+        self.assertEqual(upper.kind[-1], POINT)
+        _, regions = get_horizontal_bounded_regions(ratio_grids, focus_list)
+        self.assertSameSigns(lower, [region.lower_bound for region in regions])
+        self.assertSameSigns(upper, [region.upper_bound for region in regions])
+
+    def test_round_trip(self):
+        lower, _ = vertical_bounded_regions_batch(angle_grids_batch(np.array([0, 0.3])))
+        circles = lower.to_circles()
+        self.assertEqual(len(circles), 12)
+        np.testing.assert_array_equal(CircleBatch.from_circles(circles).evaluate(XS, YS),
+                                      lower.reshape(-1).evaluate(XS, YS))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+from unittest import TestCase, main
+
+from src.benchmark import QUICK_MATRIX, Case, find_regressions, make_cases, measure
+
+
+class BenchmarkTestCases(TestCase):
+    def test_measure(self):
+        result = measure(Case("noop", {"n": 1}, lambda: None, repeat=3, frames=2))
+        self.assertEqual(result["name"], "noop")
+        self.assertLessEqual(result["min_s"], result["median_s"])
+        self.assertIn("frames_per_s", result)
+
+    def test_quick_matrix_covers_every_benchmark(self):
+        names = [case.name for case in make_cases(QUICK_MATRIX)]
+        self.assertEqual(names, ["construction", "label_frame", "colorize", "matplotlib_frame", "matplotlib_frame",
+                                 "encode_gif", "end_to_end"])
+
+    def test_find_regressions(self):
+        baseline = [
+            {"name": "a", "params": {"p": 6}, "median_s": 1.0},
+            {"name": "a", "params": {"p": 12}, "median_s": 1.0},
+        ]
+        results = [
+            {"name": "a", "params": {"p": 6}, "median_s": 1.05},
+            {"name": "a", "params": {"p": 12}, "median_s": 1.5},
+            {"name": "b", "params": {}, "median_s": 9.0},
+        ]
+        regressions = find_regressions(results, baseline, threshold=0.1)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("'p': 12", regressions[0])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+from unittest import TestCase, main
+
+import numpy as np
+from numpy import exp, inf, pi
+
+from src.bipolar import band_index, bipolar_coordinates
+from src.circles import Point2D
+from src.utils import cot
+
+FOCUS_LIST = [Point2D(0, 1), Point2D(0, -1)]
+
+
+class BipolarCoordinatesTestCases(TestCase):
+    def test_angle_on_vertical_bound(self):
+        # Points on the circle through both foci centred at (cot(a), 0).
+        for angle in [0.3, pi / 2, 2.5]:
+            centre_x = cot(angle)
+            radius = np.sqrt(centre_x**2 + 1)
+            phis = np.array([0.1, 1.0, 2.0, 4.0, 5.5])
+            xs = centre_x + radius * np.cos(phis)
+            ys = radius * np.sin(phis)
+            angles, _ = bipolar_coordinates(xs, ys, FOCUS_LIST)
+            np.testing.assert_allclose(angles, angle)
+
+    def test_ratio_on_appolonian_circle(self):
+        # |z - f1|^2 = k |z - f2|^2 is a circle centred at (0, (1 + k) / (1 - k)).
+        for ratio in [exp(-1.0), 0.5, 3.0]:
+            centre_y = (1 + ratio) / (1 - ratio)
+            radius = 2 * np.sqrt(ratio) / abs(1 - ratio)
+            phis = np.linspace(0, 2 * pi, 7)
+            xs = radius * np.cos(phis)
+            ys = centre_y + radius * np.sin(phis)
+            _, ratios = bipolar_coordinates(xs, ys, FOCUS_LIST)
+            np.testing.assert_allclose(ratios, ratio)
+
+
+class BandIndexTestCases(TestCase):
+    def test_ordered_bands(self):
+        grids = [(0.0, 1.0), (1.0, 2.0), (2.0, inf)]
+        res = band_index(np.array([0.5, 1.5, 10.0, inf]), grids)
+        np.testing.assert_array_equal(res, [0, 1, 2, 2])
+
+    def test_wrapping_band(self):
+        grids = [(2.0, 3.0), (3.0, 0.5), (0.5, 2.0)]
+        res = band_index(np.array([0.1, 1.0, 2.5, 3.1]), grids)
+        np.testing.assert_array_equal(res, [1, 2, 0, 1])
+
+
+if __name__ == '__main__':
+    main()
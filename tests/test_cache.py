@@ -0,0 +1,54 @@
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+import numpy as np
+from numpy import inf
+
+from src.cache import FrameCache, frame_key
+from src.circles import Point2D, Range
+
+
+class FrameKeyTestCases(TestCase):
+    def test_stable(self):
+        params = dict(focus_list=[Point2D(0, 1), Point2D(0, -1)],
+                      ratio_grids=[Range(0.0, 1.0), Range(1.0, inf)],
+                      init_angle=0.1)
+        self.assertEqual(frame_key(**params), frame_key(**dict(params)))
+
+    def test_distinguishes_parameters(self):
+        self.assertNotEqual(frame_key(init_angle=0.1), frame_key(init_angle=0.1 + 1e-12))
+        self.assertNotEqual(frame_key(p=6), frame_key(p=7))
+
+
+class FrameCacheTestCases(TestCase):
+    def test_memory_lru(self):
+        frame = np.zeros(100, dtype=np.uint8)
+        cache = FrameCache(max_memory_bytes=250)
+        for key in "abc":
+            cache.put(key, frame)
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("b"))
+        cache.put("d", frame)
+        self.assertIsNone(cache.get("c"))
+        self.assertIsNotNone(cache.get("b"))
+
+    def test_disk_tier(self):
+        frame = np.arange(12, dtype=np.uint8).reshape(3, 4)
+        with TemporaryDirectory() as tmp_dir:
+            FrameCache(directory=tmp_dir).put("key", frame)
+            cache = FrameCache(directory=tmp_dir)
+            np.testing.assert_array_equal(cache.get("key"), frame)
+            self.assertIsNone(cache.get("other"))
+
+    def test_disk_eviction(self):
+        rng = np.random.RandomState(0)
+        with TemporaryDirectory() as tmp_dir:
+            cache = FrameCache(max_memory_bytes=0, directory=tmp_dir, max_disk_bytes=3000)
+            for key in "abcd":
+                cache.put(key, rng.randint(0, 255, 1000).astype(np.uint8))
+            self.assertIsNone(cache.get("a"))
+            self.assertIsNotNone(cache.get("d"))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+import subprocess
+import sys
+from unittest import TestCase, main
+
+import numpy as np
+
+from src.checkerboard import (get_angle_grids, get_ratio_grids, make_checkerboard, render_checkerboard,
+                              render_objects)
+from src.circles import Point2D, Range
+
+FOCUS_LIST = [Point2D(0, 1), Point2D(0, -1)]
+WINDOW = Range(-6, 6)
+
+
+class ImportTestCases(TestCase):
+    def test_import_has_no_side_effects(self):
+        code = "import sys, src.checkerboard; print('sympy' in sys.modules)"
+        res = subprocess.run([sys.executable, "-c", code],
+                             capture_output=True,
+                             text=True,
+                             timeout=60,
+                             check=True)
+        self.assertEqual(res.stdout.strip(), "False")
+
+
+class RenderTestCases(TestCase):
+    def test_closed_form_matches_regions(self):
+        ratio_grids = get_ratio_grids()
+        for init_angle in [0, 0.3, 2.9]:
+            angle_grids = get_angle_grids(init_angle=init_angle)
+            region_list, boundaries = make_checkerboard(angle_grids, ratio_grids, FOCUS_LIST)
+            expected = render_objects(region_list, boundaries, WINDOW, WINDOW, FOCUS_LIST, plot_points=120)
+            res = render_checkerboard(angle_grids, ratio_grids, FOCUS_LIST, WINDOW, WINDOW, FOCUS_LIST,
+                                      plot_points=120)
+            np.testing.assert_array_equal(res, expected)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+from unittest import TestCase, main
+
+import numpy as np
+from numpy import inf
+
+from src.circles import AppolonianCircle, CanonicalCircle, Line, Point2D, x, y
+
+
+class EvaluateTestCases(TestCase):
+    xs = np.array([-2.0, -0.5, 0.0, 1.5, 3.0])
+    ys = np.array([1.0, -1.5, 0.25, 2.0, -3.0])
+
+    def assertMatchesAlgEq(self, circle):
+        expected = [
+            float(circle.alg_eq.subs({x: x_val, y: y_val}))
+            for x_val, y_val in zip(self.xs, self.ys)
+        ]
+        np.testing.assert_allclose(circle.evaluate(self.xs, self.ys),
+                                   expected)
+
+    def test_line(self):
+        line = Line(Point2D(-1, 0), 0)
+        self.assertMatchesAlgEq(line)
+        line.flip_insideout()
+        self.assertMatchesAlgEq(line)
+
+    def test_canonical_circle(self):
+        circle = CanonicalCircle(Point2D(0.5, 0.25), 2)
+        self.assertMatchesAlgEq(circle)
+        circle.flip_insideout()
+        self.assertMatchesAlgEq(circle)
+
+    def test_appolonian_circle(self):
+        focus1, focus2 = Point2D(0, 1), Point2D(0, -1)
+        for ratio in [0.0, 0.5, 1.0, 2.0, inf]:
+            self.assertMatchesAlgEq(AppolonianCircle(focus1, focus2, ratio))
+
+
+class KernelTestCases(TestCase):
+    xs = np.linspace(-3, 3, 7)
+    ys = np.linspace(2, -2, 7)
+
+    def test_matches_evaluate(self):
+        circles = [
+            Line(Point2D(1, 0), 0.5),
+            CanonicalCircle(Point2D(0.5, 0), 2),
+            AppolonianCircle(Point2D(0, 1), Point2D(0, -1), 2.0),
+        ]
+        for circle in circles:
+            np.testing.assert_allclose(circle.kernel(self.xs, self.ys), circle.evaluate(self.xs, self.ys))
+
+    def test_shared_between_equal_boundaries(self):
+        focus1, focus2 = Point2D(0, 1), Point2D(0, -1)
+        self.assertIs(AppolonianCircle(focus1, focus2, 0.5).kernel,
+                      AppolonianCircle(focus1, focus2, 0.5).kernel)
+
+    def test_flip_insideout_switches_kernel(self):
+        circle = CanonicalCircle(Point2D(0.5, 0), 2)
+        kernel = circle.kernel
+        circle.flip_insideout()
+        self.assertIsNot(circle.kernel, kernel)
+        np.testing.assert_allclose(circle.kernel(self.xs, self.ys), -kernel(self.xs, self.ys))
+        circle.flip_insideout()
+        self.assertIs(circle.kernel, kernel)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+import numpy as np
+
+from src.checkerboard import COL_DICT, get_angle_grids, get_ratio_grids, label_checkerboard
+from src.circles import Point2D, Range
+from src.encoding import DeltaGifWriter, GifWriter, open_writer
+from src.raster import colorize, label_palette
+
+
+class GifWriterTestCases(TestCase):
+    def test_round_trip(self):
+        from PIL import Image
+
+        frames = np.zeros((3, 8, 6, 3), dtype=np.uint8)
+        frames[0, :, :3] = (255, 255, 0)
+        frames[1, :4] = (124, 252, 0)
+        frames[2] = (0, 0, 255)
+        with TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "frames.gif"
+            with open_writer(path, fps=5) as writer:
+                self.assertIsInstance(writer, GifWriter)
+                for frame in frames:
+                    writer.append(frame)
+            self.assertEqual(writer.frame_count, 3)
+
+            with Image.open(path) as image:
+                self.assertEqual(image.n_frames, 3)
+                self.assertEqual(image.info["duration"], 200)
+                for i, frame in enumerate(frames):
+                    image.seek(i)
+                    np.testing.assert_array_equal(
+                        np.asarray(image.convert("RGB")), frame)
+
+
+class DeltaGifWriterTestCases(TestCase):
+    def test_decodes_to_colorized_labels(self):
+        from PIL import Image
+
+        focus_list = [Point2D(0, 1), Point2D(0, -1)]
+        frames = [
+            label_checkerboard(get_angle_grids(angle), get_ratio_grids(), focus_list, Range(-6, 6), Range(-6, 6),
+                               focus_list, 60, stroke_width=1.0)
+            for angle in (0, 0.01, 0.01, 0.5)
+        ]
+        with TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "frames.gif"
+            with open_writer(path, fps=5, palette=label_palette(COL_DICT)) as writer:
+                self.assertIsInstance(writer, DeltaGifWriter)
+                for frame in frames:
+                    writer.append(frame)
+            full_path = Path(tmp_dir) / "full.gif"
+            with open_writer(full_path, fps=5) as full_writer:
+                for frame in frames:
+                    full_writer.append(colorize(frame, COL_DICT))
+            self.assertLess(path.stat().st_size, full_path.stat().st_size)
+
+            with Image.open(path) as image:
+                self.assertEqual(image.n_frames, 4)
+                for i, frame in enumerate(frames):
+                    image.seek(i)
+                    np.testing.assert_array_equal(
+                        np.asarray(image.convert("RGB")), colorize(frame, COL_DICT))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+import threading
+from unittest import TestCase, main
+
+import numpy as np
+
+from src.explorer import ExplorerParams, ProgressiveRenderer, label_frame
+
+
+class ProgressiveRendererTestCases(TestCase):
+    def setUp(self):
+        self.shown = []
+        self.calls = []
+        self.renderer = ProgressiveRenderer(self.label, self.shown.append, plot_points=40, preview_points=10,
+                                            tile_size=10)
+
+    def tearDown(self):
+        self.renderer.close()
+
+    def label(self, params, plot_points, tile=None):
+        self.calls.append((params, plot_points))
+        return label_frame(params, plot_points, tile=tile)
+
+    def test_preview_then_full_frame(self):
+        params = ExplorerParams(init_angle=0.3)
+        self.renderer.update(params)
+        self.assertEqual(self.shown[0].shape, (10, 10))
+        self.assertTrue(self.renderer.wait(10))
+        np.testing.assert_array_equal(self.shown[-1], label_frame(params, 40))
+
+        del self.calls[:]
+        self.renderer.update(params)
+        self.assertTrue(self.renderer.wait(10))
+        self.assertEqual(self.calls, [])
+        self.assertEqual(self.shown[-1].shape, (40, 40))
+
+    def test_stale_refinement_is_dropped(self):
+        release = threading.Event()
+        first = ExplorerParams(init_angle=0.1)
+
+        def label(params, plot_points, tile=None):
+            if params == first and tile is not None:
+                release.wait(10)
+            return self.label(params, plot_points, tile)
+
+        self.renderer.label = label
+        self.renderer.update(first)
+        last = ExplorerParams(init_angle=0.2)
+        self.renderer.update(last)
+        release.set()
+        self.assertTrue(self.renderer.wait(10))
+        full = [labels for labels in self.shown if labels.shape == (40, 40)]
+        self.assertEqual(len(full), 1)
+        np.testing.assert_array_equal(full[0], label_frame(last, 40))
+        self.assertLessEqual(sum(params == first and points == 40 for params, points in self.calls), 1)
+
+
+if __name__ == '__main__':
+    main()
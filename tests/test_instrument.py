@@ -0,0 +1,55 @@
+import json
+import os
+import tempfile
+from unittest import TestCase, main
+
+import numpy as np
+
+from src.instrument import disable_tracing, enable_tracing, stage, trace_spec, traced
+
+
+@traced()
+def allocate(n):
+    return np.ones(n).sum()
+
+
+class TracingTestCases(TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        disable_tracing()
+        os.unlink(self.path)
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(trace_spec())
+        with stage("idle", frame=0):
+            allocate(10)
+        self.assertEqual(os.path.getsize(self.path), 0)
+
+    def test_json_lines(self):
+        enable_tracing(self.path, memory=True, create=True)
+        with stage("outer", frame=3):
+            allocate(2**16)
+        disable_tracing()
+        with open(self.path) as f:
+            inner, outer = [json.loads(line) for line in f]
+        self.assertEqual((inner["stage"], outer["stage"]), ("allocate", "outer"))
+        self.assertEqual(outer["frame"], 3)
+        self.assertGreaterEqual(outer["wall_s"], inner["wall_s"])
+        self.assertGreaterEqual(inner["alloc_peak_bytes"], 8 * 2**16)
+        self.assertGreaterEqual(outer["alloc_peak_bytes"], inner["alloc_peak_bytes"])
+
+    def test_chrome_trace(self):
+        enable_tracing(self.path, chrome=True, create=True)
+        with stage("frame"):
+            pass
+        disable_tracing()
+        with open(self.path) as f:
+            events = json.loads(f.read().rstrip().rstrip(",") + "]")
+        self.assertEqual([(event["name"], event["ph"]) for event in events], [("frame", "X")])
+
+
+if __name__ == '__main__':
+    main()
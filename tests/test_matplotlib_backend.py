@@ -0,0 +1,37 @@
+from unittest import TestCase, main
+
+import numpy as np
+
+from src.checkerboard import COL_DICT, get_angle_grids, get_ratio_grids, label_checkerboard
+from src.circles import Point2D, Range
+from src.matplotlib_backend import MatplotlibRenderer
+from src.raster import BOUNDARY, MARKER, colorize
+
+FOCUS_LIST = [Point2D(0, 1), Point2D(0, -1)]
+WINDOW = Range(-6, 6)
+
+
+class MatplotlibRendererTestCases(TestCase):
+    def make_renderer(self):
+        return MatplotlibRenderer(get_ratio_grids(), FOCUS_LIST, WINDOW, WINDOW, COL_DICT, plot_points=120)
+
+    def test_matches_closed_form_cells(self):
+        image = self.make_renderer().render(get_angle_grids(0.3))
+        self.assertEqual(image.shape, (120, 120, 3))
+        # Away from the (differently drawn) boundaries the cells are the same.
+        labels = label_checkerboard(get_angle_grids(0.3), get_ratio_grids(), FOCUS_LIST, WINDOW, WINDOW,
+                                    FOCUS_LIST, plot_points=120, stroke_width=6)
+        away = (labels & (BOUNDARY | MARKER)) == 0
+        self.assertGreater(away.mean(), 0.5)
+        np.testing.assert_array_equal(image[away], colorize(labels, COL_DICT)[away])
+
+    def test_reused_artists_match_fresh_figure(self):
+        renderer = self.make_renderer()
+        for init_angle in [0.0, 0.3, 0.9]:
+            renderer.render(get_angle_grids(init_angle))
+        np.testing.assert_array_equal(renderer.render(get_angle_grids(0.3)),
+                                      self.make_renderer().render(get_angle_grids(0.3)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+from unittest import TestCase, main
+
+import numpy as np
+from numpy import pi
+
+from src.checkerboard import get_angle_grids, get_ratio_grids, label_checkerboard
+from src.circles import Point2D, Range
+from src.moebius import (ELLIPTIC, HYPERBOLIC, LOXODROMIC, PARABOLIC, MoebiusRenderer, apply, classify,
+                         family_transforms, fixed_point_transforms, identity, interpolate, inverse, normalize,
+                         parabolic, power)
+
+FOCUS_LIST = [Point2D(0, 1), Point2D(0, -1)]
+WINDOW = Range(-6, 6)
+
+
+def assert_same_transform(a, b):
+    np.testing.assert_allclose(normalize(a) * np.sign(normalize(a)[..., :1, :1].real),
+                               normalize(b) * np.sign(normalize(b)[..., :1, :1].real),
+                               atol=1e-9)
+
+
+class TransformTestCases(TestCase):
+    zs = np.array([0.5 + 2j, -3 - 1j, 1j])
+
+    def test_fixed_points(self):
+        focus1, focus2 = Point2D(0.5, 1), Point2D(-2, 0)
+        transforms = fixed_point_transforms(focus1, focus2, np.array([1j, 2.0, 0.5 + 1j]))
+        for transform in transforms:
+            np.testing.assert_allclose(apply(transform, np.array([0.5 + 1j, -2.0])), [0.5 + 1j, -2.0])
+        np.testing.assert_array_equal(classify(transforms), [ELLIPTIC, HYPERBOLIC, LOXODROMIC])
+        self.assertEqual(classify(parabolic(focus1, np.array(0.3))), PARABOLIC)
+
+    def test_inverse_and_composition(self):
+        m = fixed_point_transforms(FOCUS_LIST[0], FOCUS_LIST[1], np.array(0.5 + 1j))
+        np.testing.assert_allclose(apply(inverse(m), apply(m, self.zs)), self.zs)
+        np.testing.assert_allclose(apply(m @ m, self.zs), apply(m, apply(m, self.zs)))
+
+    def test_power_and_interpolate(self):
+        for m in [family_transforms(family, FOCUS_LIST, np.array(0.7))
+                  for family in ["elliptic", "hyperbolic", "loxodromic", "parabolic"]]:
+            half = power(m, np.array(0.5))
+            assert_same_transform(half @ half, m)
+            path = interpolate(identity(), m, np.array([0.0, 1.0]))
+            assert_same_transform(path[0], identity())
+            assert_same_transform(path[1], m)
+
+
+class RendererTestCases(TestCase):
+    def test_elliptic_matches_label_checkerboard(self):
+        renderer = MoebiusRenderer(get_angle_grids(), get_ratio_grids(), FOCUS_LIST, WINDOW, WINDOW, 90)
+        ts = np.array([0.0, 0.3, 0.75])
+        for t, transform in zip(ts, family_transforms("elliptic", FOCUS_LIST, ts)):
+            expected = label_checkerboard(get_angle_grids(t * pi / 3), get_ratio_grids(), FOCUS_LIST, WINDOW,
+                                          WINDOW, FOCUS_LIST, 90)
+            np.testing.assert_array_equal(renderer.label(transform), expected)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+from multiprocessing import Pool
+from unittest import TestCase, main
+
+import numpy as np
+
+from src.pipeline import SharedFrameRing, attach_ring, bounded_imap, shared_imap
+
+
+def fill_frame(value: int, out: np.ndarray) -> np.ndarray:
+    out[...] = value
+    return out
+
+
+class BoundedImapTestCases(TestCase):
+    def test_keeps_order(self):
+        values = [-i for i in range(20)]
+        with Pool(2) as pool:
+            res = list(bounded_imap(pool, abs, values, max_pending=3))
+        self.assertEqual(res, list(range(20)))
+
+
+class SharedImapTestCases(TestCase):
+    def test_frames_in_order(self):
+        with SharedFrameRing(3, (4, 5)) as ring, \
+                Pool(2, initializer=attach_ring, initargs=ring.spec) as pool:
+            res = [
+                frame.copy()
+                for frame in shared_imap(pool, fill_frame, range(10), ring)
+            ]
+        self.assertEqual(len(res), 10)
+        for i, frame in enumerate(res):
+            np.testing.assert_array_equal(frame, np.full((4, 5), i))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+from unittest import TestCase, main
+
+import numpy as np
+
+from src.batch import CircleBatch, frame_boundaries
+from src.checkerboard import COL_DICT, get_angle_grids, get_ratio_grids
+from src.circles import CanonicalCircle, Line, Point2D, Range
+from src.raster import (BOUNDARY, BOUNDARY_LEVELS, BOUNDARY_SHIFT, MARKER, PARITY, label_palette, make_grid,
+                        quantize_coverage, stroke_coverage, to_rgb)
+
+
+class StrokeCoverageTestCases(TestCase):
+    # Pixel centres at -2, -1, ..., 2.
+    xs, ys = make_grid(Range(-2.5, 2.5), Range(-2.5, 2.5), 5)
+
+    def test_line(self):
+        line = CircleBatch.from_circles([Line(Point2D(1, 0), 0)])
+        coverage = stroke_coverage(line, self.xs, self.ys, pixel_size=1, width=1)
+        np.testing.assert_allclose(coverage, np.tile([0, 0, 1, 0, 0], (5, 1)))
+        coverage = stroke_coverage(line, self.xs, self.ys, pixel_size=1, width=2)
+        np.testing.assert_allclose(coverage, np.tile([0, 0.5, 1, 0.5, 0], (5, 1)))
+
+    def test_nearest_boundary_wins(self):
+        circles = CircleBatch.from_circles([
+            CanonicalCircle(Point2D(0, 0), 1.5),
+            CanonicalCircle(Point2D(0, 0), 0),
+        ])
+        coverage = stroke_coverage(circles, self.xs, self.ys, pixel_size=1, width=1)
+        self.assertEqual(coverage[2, 2], 1)
+        self.assertAlmostEqual(coverage[2, 0], 0.5)
+        self.assertAlmostEqual(coverage[2, 1], 0.5)
+        self.assertEqual(coverage[0, 0], 0)
+
+    def test_frame_boundaries_meet_at_foci(self):
+        focus_list = [Point2D(0.5, 1), Point2D(-0.5, -1)]
+        boundaries = frame_boundaries(get_angle_grids(0.3), get_ratio_grids(), focus_list)
+        angle_bounds = boundaries[:6]
+        for focus in focus_list:
+            np.testing.assert_allclose(angle_bounds.distance(np.array(focus.x), np.array(focus.y)),
+                                       0,
+                                       atol=1e-12)
+
+
+class LabelPaletteTestCases(TestCase):
+    def test_blends_boundary_over_cell(self):
+        palette = label_palette(COL_DICT, "black")
+        np.testing.assert_array_equal(palette[0], to_rgb(COL_DICT[0]))
+        np.testing.assert_array_equal(palette[PARITY], to_rgb(COL_DICT[1]))
+        np.testing.assert_array_equal(palette[BOUNDARY], [0, 0, 0])
+        np.testing.assert_array_equal(palette[MARKER | PARITY], [0, 0, 0])
+        half = quantize_coverage(np.array(0.5))
+        level = half >> BOUNDARY_SHIFT
+        self.assertEqual(level, round(BOUNDARY_LEVELS / 2))
+        np.testing.assert_array_equal(
+            palette[half], np.round(np.array(to_rgb(COL_DICT[0])) * (1 - level / BOUNDARY_LEVELS)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+import io
+import tempfile
+import threading
+from pathlib import Path
+from unittest import TestCase, main
+
+import numpy as np
+
+from src.checkerboard import get_angle_grids, get_ratio_grids, label_checkerboard
+from src.circles import Point2D, Range
+from src.server import RenderClient, RenderServer, labels_of
+
+
+class RenderServerTestCases(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = Path(cls.tmp.name) / "render.sock"
+        cls.server = RenderServer(cls.path, processes=2)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.thread.join()
+        cls.server.server_close()
+        cls.tmp.cleanup()
+
+    def test_replies_in_order(self):
+        focus_list = [Point2D(0, 1), Point2D(0, -1)]
+        angles = [0.1, 0.2, 0.1, 0.4]
+        with RenderClient(self.path) as client:
+            replies = list(client.render_many(
+                {"id": i, "init_angle": angle, "plot_points": 40, "format": "labels"}
+                for i, angle in enumerate(angles)))
+        self.assertEqual([reply["id"] for reply in replies], [0, 1, 2, 3])
+        for reply, angle in zip(replies, angles):
+            expected = label_checkerboard(get_angle_grids(angle), get_ratio_grids(), focus_list, Range(-6, 6),
+                                          Range(-6, 6), focus_list, 40)
+            np.testing.assert_array_equal(labels_of(reply), expected)
+
+    def test_png_and_errors(self):
+        from PIL import Image
+
+        with RenderClient(self.path) as client:
+            reply = client.render(id="a", plot_points=30, colours=["red", "blue"])
+            with Image.open(io.BytesIO(reply["data"])) as image:
+                self.assertEqual(image.size, (30, 30))
+            self.assertEqual(client.render(id="b", zoom=2), {"id": "b", "error": "unknown fields: zoom"})
+            self.assertIn("error", client.render(id="c", format="tiff"))
+            client._file.write(b"not json\n")
+            client._file.flush()
+            self.assertIn("error", client.receive())
+
+
+if __name__ == '__main__':
+    main()
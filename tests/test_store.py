@@ -0,0 +1,44 @@
+import tempfile
+from multiprocessing import Pool
+from unittest import TestCase, main
+
+import numpy as np
+
+from src.store import FrameStore, fill_store
+
+
+def render_constant(value, out):
+    out[:] = value
+    return out
+
+
+class FrameStoreTestCases(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_resumes_with_same_key(self):
+        with FrameStore(self.tmp.name, 4, (2, 3), key="a") as store:
+            self.assertEqual(store.missing(), [0, 1, 2, 3])
+            store.write(2, np.full((2, 3), 7))
+        with FrameStore(self.tmp.name, 4, (2, 3), key="a") as store:
+            self.assertEqual(store.missing(), [0, 1, 3])
+            np.testing.assert_array_equal(store[2], 7)
+        with FrameStore(self.tmp.name, 4, (2, 3), key="b") as store:
+            self.assertEqual(store.missing(), [0, 1, 2, 3])
+            np.testing.assert_array_equal(store[2], 0)
+
+    def test_fill_store(self):
+        with FrameStore(self.tmp.name, 5, (4, 4), key="a") as store:
+            with Pool(2) as pool:
+                done = list(fill_store(pool, render_constant, [(i, 10 * i) for i in [1, 3, 4]], store))
+            self.assertEqual(sorted(done), [1, 3, 4])
+            self.assertEqual(store.missing(), [0, 2])
+            np.testing.assert_array_equal(store[3:5], np.array([30, 40])[:, np.newaxis, np.newaxis] +
+                                          np.zeros((2, 4, 4)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import cmath
+import math
+import re
+import tempfile
+import xml.etree.ElementTree as ElementTree
+from pathlib import Path
+from unittest import TestCase, main
+
+import numpy as np
+
+from src.checkerboard import COL_DICT, get_angle_grids, get_ratio_grids, label_checkerboard
+from src.circles import Point2D, Range
+from src.raster import BOUNDARY, MARKER, PARITY, make_grid
+from src.svg import _Plane, cell_path, cell_sectors, write_animated_svg
+
+FOCUS_LIST = [Point2D(0, 1), Point2D(0, -1)]
+WINDOW = Range(-6, 6)
+
+
+def flatten(path: str):
+    """Polygons approximating the subpaths of an SVG path of M, L, A and Z commands."""
+    polygons, points, position = [], [], 0j
+    for command, args in re.findall(r"([MLAZ])([^MLAZ]*)", path):
+        values = [float(v) for v in re.split(r"[ ,]+", args.strip()) if v]
+        if command == "Z":
+            polygons.append(points)
+            continue
+        end = complex(values[-2], values[-1])
+        if command == "A":
+            radius, large, sweep = values[0], values[3], values[4]
+            half = (end - position) / 2
+            offset = math.sqrt(max(radius**2 - abs(half)**2, 0)) * 1j * half / abs(half)
+            centre = position + half + (offset if large != sweep else -offset)
+            start_angle = cmath.phase(position - centre)
+            turn = (cmath.phase(end - centre) - start_angle) % (2 * math.pi)
+            if not sweep:
+                turn -= 2 * math.pi
+            points.extend(centre + radius * cmath.exp(1j * (start_angle + turn * t))
+                          for t in np.linspace(0, 1, 32)[1:])
+        elif command == "M":
+            points = []
+        points.append(end)
+        position = end
+    return [np.array([(p.real, p.imag) for p in polygon]) for polygon in polygons]
+
+
+class CellPathTestCases(TestCase):
+    def test_paths_cover_cells(self):
+        from matplotlib.path import Path as MplPath
+
+        xs, ys = make_grid(WINDOW, WINDOW, 120)
+        points = np.stack(np.broadcast_arrays(xs, -ys), axis=-1).reshape(-1, 2)
+        # Ratio bands without a bound at 1 put w = 1 inside cells, which are then split there.
+        ratios = [0.0] + [math.exp(0.5 * i + 0.2) for i in range(-4, 4)] + [math.inf]
+        for ratio_grids in [get_ratio_grids(), [Range(*band) for band in zip(ratios, ratios[1:])]]:
+            angle_grids = get_angle_grids(0.3)
+            labels = label_checkerboard(angle_grids, ratio_grids, FOCUS_LIST, WINDOW, WINDOW, FOCUS_LIST, 120,
+                                        stroke_width=3.0)
+            hits = np.zeros((2, len(points)), dtype=int)
+            for parity, *sector in cell_sectors(angle_grids, ratio_grids):
+                for polygon in flatten(cell_path(sector, _Plane(FOCUS_LIST), 3000)):
+                    hits[parity] += MplPath(polygon).contains_points(points)
+            clear = ((labels & (BOUNDARY | MARKER)) == 0).ravel()
+            parity = (labels & PARITY).ravel().astype(bool)
+            np.testing.assert_array_equal(hits[1][clear], parity[clear])
+            np.testing.assert_array_equal(hits[0][clear], ~parity[clear])
+
+    def test_animated_svg(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "sweep.svg"
+            write_animated_svg(path, [get_angle_grids(i / 3) for i in range(3)], get_ratio_grids(), FOCUS_LIST,
+                               WINDOW, WINDOW, COL_DICT, fps=10)
+            root = ElementTree.parse(path).getroot()
+            animations = root.findall("{http://www.w3.org/2000/svg}g/{http://www.w3.org/2000/svg}animate")
+            self.assertEqual([a.get("keyTimes") for a in animations], ["0;0.3333333", "0;0.3333333;0.6666667",
+                                                                       "0;0.6666667"])
+
+
+if __name__ == '__main__':
+    main()
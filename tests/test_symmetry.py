@@ -0,0 +1,64 @@
+from unittest import TestCase, main
+
+import numpy as np
+from numpy import exp, inf, pi
+
+from src.bipolar import label_cells
+from src.circles import Point2D, Range
+from src.raster import make_grid
+from src.symmetry import (FramePlan, band_permutation, limit_retention, mirrored_label_cells,
+                          plan_frames, replay_frames)
+from src.utils import mod_
+
+FOCUS_LIST = [Point2D(0, 1), Point2D(0, -1)]
+RATIO_GRIDS = [Range(lower, upper) for lower, upper in zip(
+    [0.0] + [exp(0.5 * i) for i in range(-4, 5)],
+    [exp(0.5 * i) for i in range(-4, 5)] + [inf])]
+
+
+def angle_grids(init_angle, p=6):
+    return [(mod_(i * pi / p + init_angle, pi), mod_((i + 1) * pi / p + init_angle, pi))
+            for i in range(p)]
+
+
+class PlanFramesTestCases(TestCase):
+    def test_even_p_swaps_colours(self):
+        plans = plan_frames([angle_grids(a) for a in [0.1, 0.2, 0.1 + pi / 6, 0.2 + pi / 3]])
+        self.assertEqual(plans, [FramePlan(0, False), FramePlan(1, False),
+                                 FramePlan(0, True), FramePlan(1, False)])
+
+    def test_odd_p_only_repeats_after_pi(self):
+        plans = plan_frames([angle_grids(a, p=5) for a in [0.1, 0.1 + pi / 5, 0.1 + pi]])
+        self.assertEqual(plans, [FramePlan(0, False), FramePlan(1, False), FramePlan(0, False)])
+
+    def test_limit_retention(self):
+        plans = [FramePlan(0, False), FramePlan(1, False), FramePlan(0, True), FramePlan(1, True)]
+        self.assertEqual(limit_retention(plans, 10, max_bytes=20), plans)
+        self.assertEqual(limit_retention(plans, 10, max_bytes=10),
+                         [FramePlan(0, False), FramePlan(1, False), FramePlan(0, True), FramePlan(3, False)])
+
+    def test_replay_frames(self):
+        plans = [FramePlan(0, False), FramePlan(1, False), FramePlan(0, True)]
+        rendered = iter([np.array([0, 1, 2], dtype=np.uint8), np.array([7], dtype=np.uint8)])
+        frames = list(replay_frames(plans, rendered))
+        np.testing.assert_array_equal(frames[2], [1, 0, 3])
+
+
+class MirrorTestCases(TestCase):
+    def test_band_permutation(self):
+        perm = band_permutation(RATIO_GRIDS, lambda r: inf if r == 0 else 0.0 if r == inf else 1 / r)
+        np.testing.assert_array_equal(perm, list(range(9, -1, -1)))
+        self.assertIsNone(band_permutation([(0.0, 1.0), (1.0, 3.0), (3.0, inf)], lambda r: 1 / r if r else inf))
+
+    def test_matches_full_evaluation(self):
+        for init_angle in [0.0, 0.3, pi / 12]:
+            for plot_points in [41, 40]:
+                xs, ys = make_grid(Range(-6, 6), Range(-6, 6), plot_points)
+                expected = label_cells(xs, ys, angle_grids(init_angle), RATIO_GRIDS, FOCUS_LIST)
+                res = mirrored_label_cells(xs, ys, angle_grids(init_angle), RATIO_GRIDS, FOCUS_LIST)
+                for index, expected_index in zip(res, expected):
+                    np.testing.assert_array_equal(index, expected_index)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase, main
+
+import numpy as np
+
+from src.checkerboard import (COL_DICT, AnimationConfig, get_angle_grids, get_ratio_grids, label_checkerboard,
+                              render_still, render_tile)
+from src.raster import colorize
+from src.tiling import split_tiles
+
+
+class SplitTilesTestCases(TestCase):
+    def test_covers_frame_once(self):
+        coverage = np.zeros((10, 7), dtype=int)
+        for tile in split_tiles(10, 7, 4):
+            coverage[tile.index] += 1
+        np.testing.assert_array_equal(coverage, 1)
+
+
+class TiledRenderTestCases(TestCase):
+    config = AnimationConfig(plot_points=45)
+
+    def label(self, **kwargs):
+        config = self.config
+        return label_checkerboard(get_angle_grids(0.3), get_ratio_grids(), config.focus_list, config.x_range,
+                                  config.y_range, config.focus_list, config.plot_points, **kwargs)
+
+    def test_tiles_match_whole_frame(self):
+        for stroke_width in [None, 1.5]:
+            expected = self.label(stroke_width=stroke_width)
+            res = np.zeros_like(expected)
+            for tile in split_tiles(45, 45, 16):
+                res[tile.index] = self.label(stroke_width=stroke_width, tile=tile)
+            np.testing.assert_array_equal(res, expected)
+
+    def test_render_still(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "still.npy"
+            render_still(self.config, 0.3, path, tile_size=16, processes=2)
+            expected = render_tile(split_tiles(45, 45, 45)[0], 0.3, self.config)
+            np.testing.assert_array_equal(np.load(path), expected)
+
+    def test_render_still_image(self):
+        from PIL import Image
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "still.png"
+            render_still(self.config, 0.3, path, tile_size=16, processes=2)
+            with Image.open(path) as image:
+                self.assertEqual(image.mode, "P")
+                np.testing.assert_array_equal(np.asarray(image.convert("RGB")),
+                                              colorize(self.label(), COL_DICT))
+
+
+if __name__ == '__main__':
+    main()
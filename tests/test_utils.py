@@ -1,8 +1,9 @@
 from unittest import TestCase, main
 
+import numpy as np
 from numpy import inf, pi
 
-from src.utils import cot
+from src.utils import cot, mod_
 
 
 class CotTestCases(TestCase):
@@ -20,6 +21,19 @@ class CotTestCases(TestCase):
         self.assertRaises(Exception, cot, -1)
         self.assertRaises(Exception, cot, 2 * pi)
 
+    def test_array(self):
+        angles = np.array([0, pi / 4, pi / 2, 3 * pi / 4, pi])
+        res = cot(angles)
+        np.testing.assert_array_equal(res, [cot(a) for a in angles])
+        self.assertRaises(Exception, cot, np.array([0.1, -1]))
+
+
+class ModTestCases(TestCase):
+    def test_array_matches_scalar(self):
+        values = [-2 * pi, -0.5, 0, 0.5, pi, pi + 0.5, 2 * pi, 3 * pi - 0.5]
+        res = mod_(np.array(values), pi)
+        np.testing.assert_allclose(res, [mod_(v, pi) for v in values], rtol=0, atol=1e-15)
+
 
 if __name__ == '__main__':
     main()
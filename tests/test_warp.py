@@ -0,0 +1,51 @@
+from unittest import TestCase, main
+
+import numpy as np
+
+from src.circles import Point2D, Range
+from src.moebius import elliptic, identity
+from src.warp import FIXED_POINT_BITS, TextureWarper, remap_table, warp
+
+FOCUS_LIST = [Point2D(0, 1), Point2D(0, -1)]
+WINDOW = Range(-6, 6)
+
+
+class WarpTestCases(TestCase):
+    transform = elliptic(*FOCUS_LIST, 0.7)
+
+    def test_identity_keeps_image(self):
+        image = np.random.default_rng(0).integers(0, 256, (30, 30, 3), dtype=np.uint8)
+        table = remap_table(identity(), WINDOW, WINDOW, 30, image.shape[:2])
+        np.testing.assert_array_equal(warp(image, table), image)
+
+    def test_bilinear_reproduces_ramps(self):
+        images = np.stack(np.meshgrid(np.arange(40.0), np.arange(30.0)), axis=-1)
+        table = remap_table(self.transform, WINDOW, WINDOW, 50, (30, 40))
+        inside = table.cols >= 0
+        self.assertTrue(inside.any() and not inside.all())
+        res = warp(images, table, fill=-1)
+        np.testing.assert_allclose(res[inside, 0], table.cols[inside], atol=1e-5)
+        np.testing.assert_allclose(res[inside, 1], table.rows[inside], atol=1e-5)
+        np.testing.assert_array_equal(res[~inside], -1)
+
+        fixed = remap_table(self.transform, WINDOW, WINDOW, 50, (30, 40), dtype=np.int16)
+        np.testing.assert_array_equal(fixed.cols >= 0, inside)
+        np.testing.assert_allclose(warp(images, fixed, fill=-1)[..., 0], res[..., 0],
+                                   atol=2**-FIXED_POINT_BITS)
+
+    def test_wrap_fills_frame(self):
+        image = np.random.default_rng(1).integers(0, 256, (16, 24), dtype=np.uint8)
+        table = remap_table(self.transform, WINDOW, WINDOW, 50, image.shape, wrap=True)
+        self.assertTrue((table.cols >= 0).all() and (table.cols < 24).all())
+        self.assertEqual(warp(image, table).shape, (50, 50))
+
+    def test_tables_are_cached(self):
+        warper = TextureWarper(WINDOW, WINDOW, 20, (10, 10), cache_size=1)
+        table = warper.table(self.transform)
+        self.assertIs(warper.table(self.transform), table)
+        warper.table(identity())
+        self.assertIsNot(warper.table(self.transform), table)
+
+
+if __name__ == '__main__':
+    main()